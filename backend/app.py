@@ -1,18 +1,35 @@
 import os
+import json
+import math
+import hashlib
+import re
 import requests
-from flask import Flask, jsonify, request, session, redirect, send_from_directory
+from flask import Flask, jsonify, request, session, redirect, g, Response
 from dotenv import load_dotenv
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date, timedelta
-from apscheduler.schedulers.background import BackgroundScheduler
-import telegram
 import logging
 import asyncio
+import time
+import threading
+import socket
+import atexit
+import contextvars
+import gzip
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import naver_real_estate as nre
-from sqlalchemy import text
+import http_client
+import metrics
+from caching import SnapshotCache, LRUCache, make_backend
+import json_response
+from json_response import stream_json
+from static_assets import StaticManifest
+from sqlalchemy import text, select, insert, update, delete, func, or_, and_
+from sqlalchemy.exc import IntegrityError
 
 # --- 로깅 설정 ---
 logging.basicConfig(level=logging.INFO)
@@ -23,9 +40,12 @@ backend_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(backend_dir, '..'))
 # 현재 파일의 절대 경로를 기준으로 static_folder의 절대 경로를 계산합니다.
 static_folder_path = os.path.join(project_root, 'frontend', 'dist')
-app = Flask(__name__, static_folder=static_folder_path, static_url_path='/')
+# 정적 파일은 Flask 기본 static 라우트 대신 serve()가 manifest로 응답합니다.
+app = Flask(__name__, static_folder=None)
+static_manifest = StaticManifest(static_folder_path).reload()
 # CORS: 프론트 도메인만 허용 (기본은 로컬 개발 도메인)
-CORS(app, supports_credentials=True, origins=[os.environ.get('FRONTEND_ORIGIN', 'http://localhost:5173')])
+CORS(app, supports_credentials=True, origins=[os.environ.get('FRONTEND_ORIGIN', 'http://localhost:5173')],
+     expose_headers=['X-Next-Cursor'])
 
 # --- 설정 ---
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'a-very-secret-key')
@@ -58,6 +78,60 @@ KAKAO_CLIENT_SECRET = os.environ.get('KAKAO_CLIENT_SECRET')
 KAKAO_REDIRECT_URI = os.environ.get('KAKAO_REDIRECT_URI', 'http://localhost:5001/api/kakao/callback')
 FRONTEND_ORIGIN = os.environ.get('FRONTEND_ORIGIN', 'http://localhost:5173')
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
+# 외부 API 주소 (벤치마크에서 로컬 대역 서버를 가리키도록 바꿀 수 있음, bench/ 참고)
+ODCLOUD_BASE_URL = os.environ.get('ODCLOUD_BASE_URL', 'https://api.odcloud.kr')
+KAKAO_AUTH_BASE_URL = os.environ.get('KAKAO_AUTH_BASE_URL', 'https://kauth.kakao.com')
+KAKAO_API_BASE_URL = os.environ.get('KAKAO_API_BASE_URL', 'https://kapi.kakao.com')
+TELEGRAM_API_BASE_URL = os.environ.get('TELEGRAM_API_BASE_URL', 'https://api.telegram.org/bot')
+# 청약 공고 스냅샷 캐시 설정 (REDIS_URL이 있으면 모든 워커가 하나의 캐시를 공유)
+FEED_CACHE_TTL = int(os.environ.get('FEED_CACHE_TTL', 300))
+FEED_CACHE_STALE_TTL = int(os.environ.get('FEED_CACHE_STALE_TTL', 3600))
+REDIS_URL = os.environ.get('REDIS_URL')
+# odcloud 공고 동기화 설정
+FEED_SYNC_PAGE_SIZE = int(os.environ.get('FEED_SYNC_PAGE_SIZE', 100))
+FEED_SYNC_WORKERS = int(os.environ.get('FEED_SYNC_WORKERS', 4))
+FEED_SYNC_INTERVAL_MINUTES = int(os.environ.get('FEED_SYNC_INTERVAL_MINUTES', 30))
+# 텔레그램 발송 동시성 및 알림 bulk insert 배치 크기
+TELEGRAM_SEND_CONCURRENCY = int(os.environ.get('TELEGRAM_SEND_CONCURRENCY', 20))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 500))
+# 알림 목록 API 페이지 크기
+NOTIFICATION_PAGE_SIZE = 30
+NOTIFICATION_PAGE_SIZE_MAX = 100
+# 단지 검색 결과 개수
+SEARCH_RESULT_LIMIT = 50
+SEARCH_RESULT_LIMIT_MAX = 500
+# 네이버 매물 DataFrame 캐시 (단지 수 기준 LRU + TTL)
+SALES_CACHE_SIZE = int(os.environ.get('SALES_CACHE_SIZE', 256))
+SALES_CACHE_TTL = int(os.environ.get('SALES_CACHE_TTL', 300))
+# 급매 판정 기본값
+BARGAIN_METHOD = os.environ.get('BARGAIN_METHOD', 'mean')
+BARGAIN_THRESHOLD = float(os.environ.get('BARGAIN_THRESHOLD', 0.95))
+# 여러 단지 급매 스캔: 동시 조회 단지 수, 요청당 최대 단지 수, 반환할 급매 수
+SCAN_WORKERS = int(os.environ.get('SCAN_WORKERS', 8))
+SCAN_MAX_COMPLEXES = 50
+SCAN_RESULT_LIMIT = 100
+# 찜한 단지 매물 감시 주기 및 알림 메시지에 표시할 항목 수
+LISTING_WATCH_INTERVAL_MINUTES = int(os.environ.get('LISTING_WATCH_INTERVAL_MINUTES', 60))
+LISTING_ALERT_MAX_LINES = 5
+# 로그인 사용자 정보 캐시 (워커별). 다른 워커에서 바뀐 프로필은 최대 TTL초 뒤에 반영됩니다.
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+# 스케줄러 리더 임대: 리더가 RENEW 주기로 갱신하고, TTL 동안 갱신이 없으면 다른 워커가 넘겨받습니다.
+SCHEDULER_LEASE_TTL_SECONDS = int(os.environ.get('SCHEDULER_LEASE_TTL_SECONDS', 60))
+SCHEDULER_LEASE_RENEW_SECONDS = int(os.environ.get('SCHEDULER_LEASE_RENEW_SECONDS', 20))
+JOB_RUN_RETENTION_DAYS = int(os.environ.get('JOB_RUN_RETENTION_DAYS', 30))
+
+# 알림 보존 정책: 이 기간이 지났거나 사용자별 최신 N건 밖인 알림은 아카이브로 옮깁니다 (0이면 해당 정책 끔).
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+NOTIFICATION_MAX_PER_USER = int(os.environ.get('NOTIFICATION_MAX_PER_USER', 500))
+# 설정하면 옮기는 알림을 메시지 본문까지 gzip JSONL 파일로 이 폴더에 내보냅니다.
+NOTIFICATION_EXPORT_DIR = os.environ.get('NOTIFICATION_EXPORT_DIR')
+
+# 시세 추이: 일 단위 집계는 이 기간만 보관하고, 주/월 단위 집계는 계속 보관합니다.
+PRICE_HISTORY_DAILY_RETENTION_DAYS = int(os.environ.get('PRICE_HISTORY_DAILY_RETENTION_DAYS', 400))
+PRICE_HISTORY_PERIODS = ('day', 'week', 'month')
+# 설정하면 /api/metrics, /api/health/jobs 요청에 'Authorization: Bearer <토큰>'이 필요합니다.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
 
 # --- 확장 ---
 db = SQLAlchemy(app, engine_options={
@@ -66,6 +140,24 @@ db = SQLAlchemy(app, engine_options={
 })
 login_manager = LoginManager(app)
 
+# --- 메트릭 ---
+# 라우트별 응답 시간과 DB 쿼리 시간을 기록합니다 (/api/metrics).
+# 스트리밍 응답은 본문 전송 전까지(핸들러 처리 시간)만 측정됩니다.
+metrics.instrument_sqlalchemy()
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method,
+                                             route=route, status=response.status_code)
+    return response
+
 # --- 모델 ---
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -89,37 +181,330 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     url = db.Column(db.String(512), nullable=True)
+    announcement_key = db.Column(db.String(100), nullable=True)  # 청약 공고 알림이면 공고 키, 매물 알림은 None
+
+    __table_args__ = (
+        # 사용자별 최신순 keyset 페이지네이션 (created_at, id)
+        db.Index('ix_notification_user_created', 'user_id', 'created_at', 'id'),
+    )
+
+class NotificationArchive(db.Model):
+    """
+    보존 기간이 지난 알림. 반복되는 메시지 본문 대신 공고 키와 URL만 남깁니다.
+    notification_id는 원래 Notification의 id입니다. SQLite는 삭제된 rowid를 다시 쓰므로 고유하지 않을 수 있습니다.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    notification_id = db.Column(db.Integer, nullable=False, index=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    announcement_key = db.Column(db.String(100), nullable=True)
+    url = db.Column(db.String(512), nullable=True)
+    is_read = db.Column(db.Boolean, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_notification_archive_user_created', 'user_id', 'created_at'),
+    )
+
+class NotificationLedger(db.Model):
+    """(사용자, 공고) 발송 이력. 이미 보낸 공고를 다시 보내지 않기 위해 사용합니다."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    announcement_key = db.Column(db.String(100), nullable=False)
+    rcept_endde = db.Column(db.Date, nullable=True, index=True)  # 마감일이 지나면 정리 대상
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'announcement_key', name='uq_notification_ledger_user_announcement'),
+        db.Index('ix_notification_ledger_announcement', 'announcement_key'),
+    )
+
+class Announcement(db.Model):
+    """odcloud 청약 공고의 로컬 사본. (주택관리번호, 공고번호)로 식별합니다."""
+    house_manage_no = db.Column(db.String(40), primary_key=True)
+    pblanc_no = db.Column(db.String(40), primary_key=True)
+    house_nm = db.Column(db.String(200), nullable=True)
+    subscrpt_area_code_nm = db.Column(db.String(50), nullable=True, index=True)
+    rcept_bgnde = db.Column(db.Date, nullable=True, index=True)
+    rcept_endde = db.Column(db.Date, nullable=True, index=True)
+    pblanc_url = db.Column(db.String(512), nullable=True)
+    data = db.Column(db.Text, nullable=False)  # 원본 JSON
+    content_hash = db.Column(db.String(40), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # 캘린더 기간 겹침 조회(rcept_endde >= start AND rcept_bgnde <= end)용 복합 인덱스
+        db.Index('ix_announcement_rcept_window', 'rcept_endde', 'rcept_bgnde'),
+    )
+
+class Favorite(db.Model):
+    """사용자가 찜한 네이버 부동산 단지. 매물 변동 감시 대상입니다."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    complex_no = db.Column(db.String(20), nullable=False)
+    complex_name = db.Column(db.String(200), nullable=True)
+    trade_type = db.Column(db.String(4), nullable=False, default='A1')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'complex_no', 'trade_type', name='uq_favorite_user_complex'),
+        db.Index('ix_favorite_complex', 'complex_no', 'trade_type'),
+    )
+
+class ListingSnapshot(db.Model):
+    """찜한 단지 매물의 마지막 상태. content_hash로 신규/삭제/가격 변경을 판별합니다."""
+    complex_no = db.Column(db.String(20), primary_key=True)
+    trade_type = db.Column(db.String(4), primary_key=True)
+    article_no = db.Column(db.String(40), primary_key=True)
+    content_hash = db.Column(db.BigInteger, nullable=False)
+    price_num = db.Column(db.Integer, nullable=True)
+    summary = db.Column(db.String(300), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class PriceHistory(db.Model):
+    """
+    단지·면적별 호가 집계를 일/주/월 단위로 미리 내려 둔 추이 테이블.
+    같은 기간에 여러 번 수집하면 samples로 가중 평균해 한 행에 합칩니다 (min_price는 최솟값).
+    기본 키 순서대로 (단지, 거래 유형, 단위, 기간) 범위를 조회하므로 수년치도 인덱스 범위 스캔 한 번입니다.
+    """
+    complex_no = db.Column(db.String(20), primary_key=True)
+    trade_type = db.Column(db.String(4), primary_key=True)
+    period = db.Column(db.String(5), primary_key=True)  # day / week / month
+    period_start = db.Column(db.Date, primary_key=True)
+    area_key = db.Column(db.Integer, primary_key=True)  # 정수 면적(㎡), areaGroup 라벨은 응답 시 만듭니다.
+    samples = db.Column(db.Integer, nullable=False)
+    listings = db.Column(db.Float, nullable=False)
+    mean_price = db.Column(db.Float, nullable=False)
+    median_price = db.Column(db.Float, nullable=False)
+    min_price = db.Column(db.Integer, nullable=False)
+
+class SchedulerLease(db.Model):
+    """스케줄러 리더 임대. expires_at 전까지는 holder 프로세스만 예약 작업을 실행합니다."""
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class JobRun(db.Model):
+    """예약 작업 실행 이력 (소요 시간과 결과)."""
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(50), nullable=False)
+    holder = db.Column(db.String(100), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False)  # running / success / failed
+    detail = db.Column(db.Text, nullable=True)  # 결과 통계(JSON) 또는 오류 메시지
+
+    __table_args__ = (
+        db.Index('ix_job_run_name_started', 'job_name', 'started_at'),
+    )
+
+class UserPrincipal(UserMixin):
+    """
+    요청마다 current_user로 쓰이는 가벼운 사용자 정보. 라우트가 읽는 컬럼만 담으며 DB 세션과 무관합니다.
+    사용자 정보를 수정할 때는 db.session.get(User, id)로 실제 행을 불러와야 합니다.
+    """
+    FIELDS = ('id', 'username', 'tier', 'address', 'telegram_chat_id', 'email')
+
+    def __init__(self, id, username, tier, address, telegram_chat_id, email):
+        self.id = id
+        self.username = username
+        self.tier = tier
+        self.address = address
+        self.telegram_chat_id = telegram_chat_id
+        self.email = email
+
+user_cache = LRUCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL, name='users')
+
+def _load_principal(user_id):
+    row = db.session.execute(
+        select(*(getattr(User, field) for field in UserPrincipal.FIELDS)).where(User.id == user_id)
+    ).first()
+    return UserPrincipal(*row) if row else None
 
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    # 세션 확인/알림 폴링처럼 잦은 요청이 사용자 식별만을 위해 DB를 다녀오지 않도록 캐시합니다.
+    user_id = int(user_id)
+    return user_cache.get_or_load(user_id, lambda: _load_principal(user_id),
+                                  should_cache=lambda principal: principal is not None)
+
+def invalidate_user(user_id):
+    """사용자 정보를 바꾼 뒤 호출해 캐시된 정보를 버립니다."""
+    user_cache.invalidate(user_id)
+
+# --- 외부 API 클라이언트 ---
+# 호스트별 keep-alive 풀, (연결, 읽기) 타임아웃, 429/5xx 재시도, 서킷 브레이커 (http_client 참고)
+odcloud_client = http_client.register('odcloud', ODCLOUD_BASE_URL, max_retries=3,
+                                      pool_size=FEED_SYNC_WORKERS * 2)
+kakao_auth_client = http_client.register('kakao_auth', KAKAO_AUTH_BASE_URL, timeout=(3, 5))
+kakao_api_client = http_client.register('kakao_api', KAKAO_API_BASE_URL, timeout=(3, 5))
+
+# --- 청약 공고 동기화 ---
+API_URL_DETAIL = '/api/ApplyhomeInfoDetailSvc/v1/getAPTLttotPblancDetail'
+
+def fetch_feed_page(page, per_page=FEED_SYNC_PAGE_SIZE):
+    """odcloud 공고 목록의 한 페이지를 조회합니다. 실패 시 예외를 그대로 올립니다."""
+    params = {'serviceKey': API_KEY, 'page': page, 'perPage': per_page, 'returnType': 'JSON'}
+    response = odcloud_client.get(API_URL_DETAIL, params=params)
+    response.raise_for_status()
+    return response.json()
+
+def fetch_all_feed_pages():
+    """첫 페이지의 totalCount로 전체 페이지 수를 계산한 뒤 나머지 페이지를 병렬로 받아옵니다."""
+    first = fetch_feed_page(1)
+    items = list(first.get('data', []))
+    total_count = first.get('totalCount') or len(items)
+    page_count = math.ceil(total_count / FEED_SYNC_PAGE_SIZE)
+    if page_count > 1:
+        with ThreadPoolExecutor(max_workers=FEED_SYNC_WORKERS) as executor:
+            for page in executor.map(fetch_feed_page, range(2, page_count + 1)):
+                items.extend(page.get('data', []))
+    return items
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except (ValueError, TypeError):
+        return None
+
+def _announcement_row(apt):
+    raw = json.dumps(apt, ensure_ascii=False, sort_keys=True)
+    return {
+        'house_manage_no': str(apt.get('HOUSE_MANAGE_NO') or ''),
+        'pblanc_no': str(apt.get('PBLANC_NO') or ''),
+        'house_nm': apt.get('HOUSE_NM'),
+        'subscrpt_area_code_nm': apt.get('SUBSCRPT_AREA_CODE_NM'),
+        'rcept_bgnde': _parse_date(apt.get('RCEPT_BGNDE')),
+        'rcept_endde': _parse_date(apt.get('RCEPT_ENDDE')),
+        'pblanc_url': apt.get('PBLANC_URL'),
+        'data': raw,
+        'content_hash': hashlib.sha1(raw.encode('utf-8')).hexdigest(),
+        'updated_at': datetime.utcnow(),
+    }
+
+def sync_announcements():
+    """
+    odcloud 전체 공고를 받아 Announcement 테이블에 upsert 합니다.
+    content_hash가 바뀐 행만 쓰므로 변경이 없는 실행은 DB 쓰기가 없습니다.
+    조회나 저장에 실패하면 로그를 남기고 예외를 다시 올려 작업 이력에 실패로 기록되게 합니다.
+    """
+    with app.app_context():
+        try:
+            feed = fetch_all_feed_pages()
+        except Exception as e:
+            logging.error(f"Failed to fetch announcement feed: {e}")
+            raise
+
+        rows = {}
+        for apt in feed:
+            row = _announcement_row(apt)
+            if row['house_manage_no'] or row['pblanc_no']:
+                rows[(row['house_manage_no'], row['pblanc_no'])] = row
+
+        existing = {
+            (house_manage_no, pblanc_no): content_hash
+            for house_manage_no, pblanc_no, content_hash in db.session.query(
+                Announcement.house_manage_no, Announcement.pblanc_no, Announcement.content_hash)
+        }
+        new_rows = [row for key, row in rows.items() if key not in existing]
+        changed_rows = [row for key, row in rows.items()
+                        if key in existing and existing[key] != row['content_hash']]
+
+        try:
+            if new_rows:
+                db.session.execute(insert(Announcement), new_rows)
+            if changed_rows:
+                db.session.execute(update(Announcement), changed_rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Failed to upsert announcements: {e}")
+            raise
+
+        if new_rows or changed_rows:
+            feed_cache.invalidate()
+        logging.info(f"Announcement sync: fetched={len(rows)} inserted={len(new_rows)} updated={len(changed_rows)}")
+        return {'fetched': len(rows), 'inserted': len(new_rows), 'updated': len(changed_rows)}
 
 # --- API 헬퍼 함수 ---
-API_URL_DETAIL = 'https://api.odcloud.kr/api/ApplyhomeInfoDetailSvc/v1/getAPTLttotPblancDetail'
-def get_apartments_by_region(region):
-    params = {'serviceKey': API_KEY, 'page': 1, 'perPage': 100, 'returnType': 'JSON'}
+def query_apartments(region=None, open_only=False):
+    """로컬 Announcement 테이블에서 공고를 조회해 odcloud 원본 형태의 dict 목록으로 반환합니다."""
+    query = Announcement.query
     if region:
-        params['cond[SUBSCRPT_AREA_CODE_NM::EQ]'] = region
+        query = query.filter(Announcement.subscrpt_area_code_nm == region)
+    if open_only:
+        query = query.filter(Announcement.rcept_endde >= date.today())
+    query = query.order_by(Announcement.rcept_bgnde.desc())
+    return [json.loads(row.data) for row in query.with_entities(Announcement.data)]
+
+def _load_open_apartments(region):
+    with app.app_context():
+        apartments = query_apartments(region, open_only=True)
+    # 버전은 같은 스냅샷의 내용에서 만들므로 ETag와 본문이 어긋나지 않습니다.
+    return {'version': make_etag(json_response.dumps(apartments).decode('utf-8')), 'apartments': apartments}
+
+# 지역별 접수 중 공고 스냅샷 캐시: 동시 미스는 한 번의 조회로 합쳐지고,
+# TTL이 지난 항목은 기존 값을 응답하면서 백그라운드에서 갱신됩니다.
+# 항목 형식이 {'version', 'apartments'}로 바뀌어 이전 형식(목록)이 남은 Redis 키와 겹치지 않도록 이름을 바꿨습니다.
+feed_cache = SnapshotCache(
+    _load_open_apartments,
+    ttl=FEED_CACHE_TTL,
+    stale_ttl=FEED_CACHE_STALE_TTL,
+    backend=make_backend(REDIS_URL),
+    name='open_apts_v2',
+)
+
+# 단지별 매물 DataFrame 캐시
+sales_cache = LRUCache(maxsize=SALES_CACHE_SIZE, ttl=SALES_CACHE_TTL, name='sales')
+# ASGI 경로(asgi.py)가 이벤트 루프에서 미리 받아 둔 이번 요청의 매물 {(complex_no, trade_type): DataFrame 또는 FetchError}
+prefetched_frames = contextvars.ContextVar('prefetched_frames', default=None)
+# 여러 단지 급매 스캔용 스레드 풀
+scan_executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix='bargain-scan')
+
+def _cache_stats():
+    values = {}
+    for name, stats in (('open_apts', feed_cache.stats()), ('sales', sales_cache.stats()),
+                        ('users', user_cache.stats())):
+        for result in ('hits', 'stale_hits', 'misses', 'evictions'):
+            if result in stats:
+                values[(name, result)] = stats[result]
+    return values
+
+metrics.Counter('cache_requests_total', 'Cache lookups by cache and result.', ['cache', 'result'],
+                callback=_cache_stats)
+metrics.Gauge('cache_size', 'Entries in the in-process LRU caches.', ['cache'],
+              callback=lambda: {('sales',): sales_cache.stats()['size'], ('users',): user_cache.stats()['size']})
+
+def get_open_snapshot(region):
+    """접수 마감일이 지나지 않은 공고 스냅샷 {'version', 'apartments'} (region이 None이면 전국).
+    조회에 실패하면 version이 None입니다."""
     try:
-        response = requests.get(API_URL_DETAIL, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json().get('data', [])
-    except Exception:
-        return []
-
-def filter_apts_by_date(apts_list):
-    filtered = []
-    today = date.today()
-    for apt in apts_list:
-        try:
-            end_date_str = apt.get('RCEPT_ENDDE')
-            if end_date_str:
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-                if today <= end_date:
-                    filtered.append(apt)
-        except (ValueError, TypeError):
-            continue
-    return filtered
+        return feed_cache.get(region)
+    except Exception as e:
+        logging.error(f"Failed to load apartments for region {region}: {e}")
+        return {'version': None, 'apartments': []}
+
+def get_open_apartments(region):
+    """접수 마감일이 지나지 않은 공고 목록 (region이 None이면 전국)."""
+    return get_open_snapshot(region)['apartments']
+
+# --- 조건부 GET ---
+# 응답 본문이 바뀌지 않았으면 직렬화 없이 304로 응답합니다. gzip 여부와 무관하게 같은 내용이므로 약한 ETag를 씁니다.
+def make_etag(*parts):
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:24]
+
+def with_validators(response, etag, private=False):
+    """응답에 ETag와 재검증 캐시 헤더를 붙입니다."""
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+    return response
+
+def not_modified(etag, private=False):
+    """클라이언트가 가진 버전이 최신이면 304 응답을, 아니면 None을 반환합니다."""
+    if request.if_none_match.contains_weak(etag):
+        return with_validators(Response(status=304), etag, private)
+    return None
 
 # --- API 라우트 ---
 @app.route('/api/register', methods=['POST'])
@@ -135,6 +520,7 @@ def register():
     new_user.set_password(password)
     db.session.add(new_user)
     db.session.commit()
+    invalidate_user(new_user.id)
     return jsonify({"message": "User registered successfully"}), 201
 
 @app.route('/api/login', methods=['POST'])
@@ -150,7 +536,7 @@ def login():
 
 @app.route('/api/kakao/login')
 def kakao_login():
-    auth_url = f"https://kauth.kakao.com/oauth/authorize?client_id={KAKAO_REST_API_KEY}&redirect_uri={KAKAO_REDIRECT_URI}&response_type=code"
+    auth_url = f"{KAKAO_AUTH_BASE_URL}/oauth/authorize?client_id={KAKAO_REST_API_KEY}&redirect_uri={KAKAO_REDIRECT_URI}&response_type=code"
     return redirect(auth_url)
 
 @app.route('/api/kakao/callback')
@@ -158,16 +544,19 @@ def kakao_callback():
     code = request.args.get('code')
     if not code: return "Authorization code not found.", 400
     
-    token_url = "https://kauth.kakao.com/oauth/token"
     token_data = {'grant_type': 'authorization_code', 'client_id': KAKAO_REST_API_KEY, 'redirect_uri': KAKAO_REDIRECT_URI, 'code': code, 'client_secret': KAKAO_CLIENT_SECRET}
-    token_res = requests.post(token_url, data=token_data)
-    access_token = token_res.json().get('access_token')
-    if not access_token: return "Failed to get access token.", 400
-
-    user_info_url = "https://kapi.kakao.com/v2/user/me"
-    headers = {'Authorization': f'Bearer {access_token}'}
-    user_info_res = requests.get(user_info_url, headers=headers)
-    user_info = user_info_res.json()
+    try:
+        token_res = kakao_auth_client.post('/oauth/token', data=token_data)
+        access_token = token_res.json().get('access_token')
+        if not access_token: return "Failed to get access token.", 400
+
+        headers = {'Authorization': f'Bearer {access_token}'}
+        user_info_res = kakao_api_client.get('/v2/user/me', headers=headers)
+        user_info_res.raise_for_status()
+        user_info = user_info_res.json()
+    except (requests.RequestException, ValueError) as e:
+        logging.error(f"Kakao login failed: {e}")
+        return "Kakao login is temporarily unavailable.", 503
     
     kakao_id = str(user_info['id'])
     nickname = user_info['properties']['nickname']
@@ -197,6 +586,7 @@ def kakao_finalize():
     new_user = User(username=username, kakao_id=session['kakao_id'])
     db.session.add(new_user)
     db.session.commit()
+    invalidate_user(new_user.id)
 
     session.pop('kakao_id', None)
     session.pop('kakao_nickname', None)
@@ -225,8 +615,15 @@ def recommendations():
         target_region = current_user.address
     
     # target_region이 None이면 (주소를 설정 안 했거나 '전국'을 선택한 경우) 전국 공고 조회
-    recommended_apts = filter_apts_by_date(get_apartments_by_region(target_region))
-    return jsonify(recommended_apts)
+    # ETag는 응답 본문과 같은 스냅샷의 버전(내용 해시)으로 만듭니다.
+    snapshot = get_open_snapshot(target_region)
+    if snapshot['version'] is None:
+        return jsonify(snapshot['apartments'])
+    etag = make_etag('recommendations', snapshot['version'])
+    cached = not_modified(etag, private=True)
+    if cached:
+        return cached
+    return with_validators(jsonify(snapshot['apartments']), etag, private=True)
 
 @app.route('/api/profile', methods=['GET', 'POST'])
 @login_required
@@ -241,37 +638,119 @@ def profile():
         })
     if request.method == 'POST':
         data = request.get_json()
-        current_user.address = data.get('address', current_user.address)
-        current_user.email = data.get('email', current_user.email)
-        current_user.telegram_chat_id = data.get('telegram_chat_id', current_user.telegram_chat_id)
+        # current_user는 캐시된 UserPrincipal이므로 실제 행을 불러와 수정합니다.
+        user = db.session.get(User, current_user.id)
+        user.address = data.get('address', user.address)
+        user.email = data.get('email', user.email)
+        user.telegram_chat_id = data.get('telegram_chat_id', user.telegram_chat_id)
         db.session.commit()
+        invalidate_user(current_user.id)
         return jsonify({"message": "Profile updated successfully"})
 
 @app.route('/api/calendar_events')
 def calendar_events():
-    events = []
-    all_apts = get_apartments_by_region(None)
-    for apt in all_apts:
-        if apt.get('RCEPT_BGNDE') and apt.get('RCEPT_ENDDE'):
-            events.append({
-                'title': apt['HOUSE_NM'],
-                'start': apt['RCEPT_BGNDE'],
-                'end': apt['RCEPT_ENDDE'],
-                'url': apt.get('PBLANC_URL', '#')
-            })
-    return jsonify(events)
+    # start/end(YYYY-MM-DD)가 주어지면 그 기간과 접수 기간이 겹치는 공고만 반환합니다.
+    start = request.args.get('start')
+    end = request.args.get('end')
+    region = request.args.get('region')
+    start_date, end_date = _parse_date(start), _parse_date(end)
+    if (start and not start_date) or (end and not end_date):
+        return jsonify({"error": "start and end must be YYYY-MM-DD."}), 400
+
+    query = db.session.query(
+        Announcement.house_nm, Announcement.rcept_bgnde, Announcement.rcept_endde, Announcement.pblanc_url
+    ).filter(Announcement.rcept_bgnde.isnot(None), Announcement.rcept_endde.isnot(None))
+    if start_date:
+        query = query.filter(Announcement.rcept_endde >= start_date)
+    if end_date:
+        query = query.filter(Announcement.rcept_bgnde <= end_date)
+    if region and region != '전국':
+        query = query.filter(Announcement.subscrpt_area_code_nm == region)
+
+    events = [{
+        'title': house_nm,
+        'start': bgnde.isoformat(),
+        'end': endde.isoformat(),
+        'url': url or '#'
+    } for house_nm, bgnde, endde, url in query.order_by(Announcement.rcept_bgnde)]
+    # 조회한 본문으로 ETag를 만들어 본문과 버전이 어긋나지 않게 하고, 바뀌지 않았으면 전송만 생략합니다.
+    body = json_response.dumps(events)
+    etag = make_etag('calendar_events', body.decode('utf-8'))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return with_validators(Response(body, mimetype='application/json'), etag)
+
+def _encode_cursor(notif):
+    return f"{notif.created_at.isoformat()}_{notif.id}"
+
+def _decode_cursor(cursor):
+    created_at, _, notif_id = cursor.rpartition('_')
+    return datetime.fromisoformat(created_at), int(notif_id)
 
 @app.route('/api/notifications')
 @login_required
 def get_notifications():
-    notifications = Notification.query.filter_by(user_id=current_user.id).order_by(Notification.created_at.desc()).all()
-    return jsonify([{
+    # 최신순 keyset 페이지네이션. 다음 페이지 커서는 X-Next-Cursor 헤더로 전달합니다.
+    limit = max(1, min(request.args.get('limit', NOTIFICATION_PAGE_SIZE, type=int), NOTIFICATION_PAGE_SIZE_MAX))
+    query = Notification.query.filter_by(user_id=current_user.id)
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor."}), 400
+        query = query.filter(or_(
+            Notification.created_at < cursor_created_at,
+            and_(Notification.created_at == cursor_created_at, Notification.id < cursor_id),
+        ))
+    notifications = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+
+    response = jsonify([{
         'id': notif.id,
         'message': notif.message,
         'is_read': notif.is_read,
         'created_at': notif.created_at.isoformat(),
         'url': notif.url
     } for notif in notifications])
+    if has_more:
+        response.headers['X-Next-Cursor'] = _encode_cursor(notifications[-1])
+    return response
+
+@app.route('/api/notifications/unread_count')
+@login_required
+def unread_notification_count():
+    count = db.session.query(func.count(Notification.id)) \
+        .filter(Notification.user_id == current_user.id, Notification.is_read.is_(False)).scalar()
+    return jsonify({"unread": count})
+
+@app.route('/api/notifications/read', methods=['POST'])
+@login_required
+def mark_notifications_read():
+    data = request.get_json() or {}
+    ids = data.get('ids') or []
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return jsonify({"message": "ids must be a list of integers."}), 400
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.id.in_(ids), Notification.is_read.is_(False))
+        .values(is_read=True)
+    )
+    db.session.commit()
+    return jsonify({"updated": result.rowcount})
+
+@app.route('/api/notifications/read_all', methods=['POST'])
+@login_required
+def mark_all_notifications_read():
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.is_read.is_(False))
+        .values(is_read=True)
+    )
+    db.session.commit()
+    return jsonify({"updated": result.rowcount})
 
 # --- 부동산 급매 API 라우트 ---
 
@@ -281,51 +760,295 @@ def search_apartments():
     if not keyword:
         return jsonify({"error": "A keyword is required."}), 400
     
-    matched_complexes = nre.search_complexes(keyword)
+    limit = max(1, min(request.args.get('limit', SEARCH_RESULT_LIMIT, type=int), SEARCH_RESULT_LIMIT_MAX))
+    matched_complexes = nre.search_complexes(keyword, limit)
     # Convert to a list of dicts for JSON response
     results = [{"name": name, "id": complex_id} for name, complex_id in matched_complexes.items()]
     return jsonify(results)
 
+def get_sales_frame(complex_no, trade_type):
+    """
+    단지의 매물 DataFrame을 (complex_no, trade_type) 단위로 캐시해 /sales와 /analysis가 공유합니다.
+    동시에 같은 단지를 요청하면 네이버 조회는 한 번만 일어납니다. 빈 결과는 캐시하지 않습니다.
+    일부 페이지라도 받지 못하면 nre.FetchError를 던지므로 불완전한 매물 목록은 캐시되거나 반환되지 않습니다.
+    ASGI 경로에서 이미 받아 둔 DataFrame(또는 FetchError)이 있으면 다시 조회하지 않습니다.
+    """
+    prefetched = prefetched_frames.get()
+    if prefetched and (complex_no, trade_type) in prefetched:
+        frame = prefetched[(complex_no, trade_type)]
+        if isinstance(frame, nre.FetchError):
+            raise frame
+        return frame
+
+    def load():
+        articles = nre.fetch_articles_with_fallback(complex_no, trade_type)
+        return nre.get_sales_dataframe(articles)
+    return sales_cache.get_or_load((complex_no, trade_type), load, should_cache=lambda df: not df.empty)
+
+@app.errorhandler(nre.FetchError)
+def handle_fetch_error(e):
+    # 일부만 받은 매물을 빈 목록이나 완전한 목록처럼 보여주지 않고 실패로 알립니다.
+    logging.warning(str(e))
+    return jsonify({"error": "Could not fetch all listings from Naver. Please try again later."}), 502
+
+def _sales_etag(df):
+    # 같은 매물 DataFrame과 같은 쿼리(fields, format, method, threshold...)면 본문이 같습니다.
+    return make_etag(request.path, nre.frame_version(df), request.query_string.decode('latin-1'))
+
+def _parse_fields(df):
+    """fields=a,b,c 쿼리 파라미터를 검증해 컬럼 목록으로 반환합니다. 없으면 전체 컬럼."""
+    fields = request.args.get('fields')
+    if not fields:
+        return list(df.columns), None
+    selected = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in selected if field not in df.columns]
+    if unknown:
+        return None, (jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400)
+    return selected, None
+
+def _is_compact():
+    return request.args.get('format') == 'compact'
+
 @app.route('/api/apartments/<complex_no>/sales')
 def get_apartment_sales(complex_no):
     trade_type = request.args.get('trade_type', 'A1') # A1: 매매, B1: 전세
-    articles = nre.fetch_articles_with_fallback(complex_no, trade_type)
-    df = nre.get_sales_dataframe(articles)
+    df = get_sales_frame(complex_no, trade_type)
+    etag = _sales_etag(df)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    fields, error = _parse_fields(df)
+    if error:
+        return error
+    df = df[fields]
     
-    # Convert DataFrame to JSON, handling potential NaN values
-    return df.to_json(orient='records')
+    # format=compact이면 컬럼별 배열, 아니면 records 배열을 청크 단위로 스트리밍
+    if _is_compact():
+        return with_validators(stream_json([json_response.dumps(json_response.columnar(df))], request), etag)
+    return with_validators(stream_json(json_response.RecordStream(df), request), etag)
 
 @app.route('/api/apartments/<complex_no>/analysis')
 def get_apartment_analysis(complex_no):
     trade_type = request.args.get('trade_type', 'A1')
-    articles = nre.fetch_articles_with_fallback(complex_no, trade_type)
-    df = nre.get_sales_dataframe(articles)
+    # 급매 기준: method=mean(평균 대비) 또는 median(중앙값 대비, IQR 이상치 표시), threshold=기준가 대비 비율
+    method = request.args.get('method', BARGAIN_METHOD)
+    threshold = request.args.get('threshold', BARGAIN_THRESHOLD, type=float)
+    if method not in ('mean', 'median'):
+        return jsonify({"error": "method must be 'mean' or 'median'."}), 400
+    df = get_sales_frame(complex_no, trade_type)
+    etag = _sales_etag(df)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
     if df.empty:
-        return jsonify({
+        return with_validators(jsonify({
             "mean_prices": [],
             "count_by_area": [],
             "bargains": []
+        }), etag)
+
+    fields, error = _parse_fields(df)
+    if error:
+        return error
+    stats = nre.compute_area_stats(df)
+    mean_prices, count_by_area = nre.analyze_area_stats(df, stats)
+    bargains_df = nre.find_bargains(df, threshold=threshold, method=method, stats=stats)
+    bargain_fields = fields + [col for col in bargains_df.columns if col not in df.columns]
+
+    if _is_compact():
+        # 전체 매물은 컬럼별 배열로, 급매는 all_sales의 행 번호와 급매 전용 컬럼만 보냅니다.
+        all_sales = json_response.columnar(df[fields])
+        extra = bargains_df[[col for col in bargains_df.columns if col not in df.columns]]
+        bargains = dict(json_response.columnar(extra), row=bargains_df.index.tolist())
+    else:
+        all_sales = json_response.RecordStream(df[fields])
+        bargains = json_response.RecordStream(bargains_df[bargain_fields])
+
+    return with_validators(stream_json(json_response.iter_json_object([
+        ("all_sales", all_sales),
+        ("mean_prices", mean_prices),
+        ("count_by_area", count_by_area),
+        ("area_stats", stats.to_dict(orient='records')),
+        ("bargains", bargains),
+    ]), request), etag)
+
+@app.route('/api/apartments/<complex_no>/trends')
+def get_apartment_trends(complex_no):
+    """
+    찜한 단지 감시 작업이 쌓은 면적별 호가 추이. period=day|week|month (기본 week),
+    선택: trade_type, start/end(YYYY-MM-DD), area(㎡ 정수). 면적별로 컬럼 배열을 반환합니다.
+    """
+    trade_type = request.args.get('trade_type', 'A1')
+    period = request.args.get('period', 'week')
+    if period not in PRICE_HISTORY_PERIODS:
+        return jsonify({"error": "period must be 'day', 'week' or 'month'."}), 400
+    start, end = request.args.get('start'), request.args.get('end')
+    start_date, end_date = _parse_date(start), _parse_date(end)
+    if (start and not start_date) or (end and not end_date):
+        return jsonify({"error": "start and end must be YYYY-MM-DD."}), 400
+    area = request.args.get('area', type=int)
+
+    query = select(PriceHistory.area_key, PriceHistory.period_start, PriceHistory.listings, PriceHistory.mean_price,
+                   PriceHistory.median_price, PriceHistory.min_price).where(
+        PriceHistory.complex_no == complex_no, PriceHistory.trade_type == trade_type, PriceHistory.period == period)
+    if start_date:
+        query = query.where(PriceHistory.period_start >= period_start(start_date, period))
+    if end_date:
+        query = query.where(PriceHistory.period_start <= end_date)
+    if area is not None:
+        query = query.where(PriceHistory.area_key == area)
+
+    series = {}
+    for area_key, start_day, listings, mean_price, median_price, min_price in db.session.execute(
+            query.order_by(PriceHistory.area_key, PriceHistory.period_start)):
+        columns = series.get(area_key)
+        if columns is None:
+            columns = series[area_key] = {'areaGroup': f"{area_key}㎡", 'period_start': [], 'listings': [],
+                                          'mean_price': [], 'median_price': [], 'min_price': []}
+        columns['period_start'].append(start_day.isoformat())
+        columns['listings'].append(round(listings, 1))
+        columns['mean_price'].append(round(mean_price))
+        columns['median_price'].append(round(median_price))
+        columns['min_price'].append(min_price)
+    return jsonify({"complex_no": complex_no, "trade_type": trade_type, "period": period,
+                    "series": list(series.values())})
+
+# 여러 단지 급매 스캔 결과에 포함할 매물 컬럼
+SCAN_BARGAIN_FIELDS = ['articleNo', 'buildingName', 'floorInfo', 'dealOrWarrantPrc', 'areaGroup', 'direction',
+                       'price_num', 'baseline_price', 'discount_pct']
+
+def resolve_scan_targets(data):
+    """
+    스캔 요청 body에서 (단지 번호 목록, {단지 번호: 이름})을 구합니다. 잘못된 요청이면 ValueError.
+    ASGI 경로(asgi.py)도 같은 규칙으로 미리 매물을 받아 두기 위해 사용합니다.
+    """
+    names = {}
+    if data.get('complex_nos'):
+        if not isinstance(data['complex_nos'], list):
+            raise ValueError("complex_nos must be a list.")
+        complex_nos = [str(no) for no in data['complex_nos']]
+    elif data.get('keyword'):
+        if not isinstance(data['keyword'], str):
+            raise ValueError("keyword must be a string.")
+        matched = nre.search_complexes(data['keyword'], SCAN_MAX_COMPLEXES)
+        complex_nos = list(matched.values())
+        names = {complex_id: name for name, complex_id in matched.items()}
+    else:
+        raise ValueError("complex_nos or keyword is required.")
+    complex_nos = list(dict.fromkeys(complex_nos))
+    if len(complex_nos) > SCAN_MAX_COMPLEXES:
+        raise ValueError(f"At most {SCAN_MAX_COMPLEXES} complexes can be scanned at once.")
+    return complex_nos, names
+
+def _scan_complex(complex_no, trade_type, method, threshold):
+    started = time.perf_counter()
+    df = get_sales_frame(complex_no, trade_type)
+    bargains = nre.find_bargains(df, threshold=threshold, method=method)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return df, bargains, elapsed_ms
+
+@app.route('/api/apartments/bargains/scan', methods=['POST'])
+def scan_bargains():
+    """
+    여러 단지의 급매를 한 번에 분석합니다.
+    body: {"complex_nos": [...]} 또는 {"keyword": "..."}, 선택: trade_type, method, threshold, limit
+    단지들은 제한된 스레드 풀에서 동시에 조회되므로 전체 시간은 가장 느린 단지 수준입니다.
+    """
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object."}), 400
+    trade_type = data.get('trade_type', 'A1')
+    method = data.get('method', BARGAIN_METHOD)
+    if method not in ('mean', 'median'):
+        return jsonify({"error": "method must be 'mean' or 'median'."}), 400
+    try:
+        threshold = float(data.get('threshold', BARGAIN_THRESHOLD))
+        limit = int(data.get('limit', SCAN_RESULT_LIMIT))
+    except (TypeError, ValueError):
+        return jsonify({"error": "threshold and limit must be numbers."}), 400
+
+    try:
+        complex_nos, names = resolve_scan_targets(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    started = time.perf_counter()
+    # 컨텍스트를 복사해 넘겨야 ASGI 경로가 미리 받아 둔 매물(prefetched_frames)을 스캔 스레드에서도 씁니다.
+    futures = {no: scan_executor.submit(contextvars.copy_context().run, _scan_complex, no, trade_type, method, threshold)
+               for no in complex_nos}
+    complexes, failures, frames = [], [], []
+    for complex_no, future in futures.items():
+        try:
+            df, bargains, elapsed_ms = future.result()
+        except Exception as e:
+            logging.error(f"Bargain scan failed for complex {complex_no}: {e}")
+            failures.append({"complex_no": complex_no, "error": str(e)[:200]})
+            continue
+        complexes.append({
+            "complex_no": complex_no,
+            "name": names.get(complex_no),
+            "listings": len(df),
+            "bargains": len(bargains),
+            "elapsed_ms": elapsed_ms,
         })
+        if not bargains.empty:
+            frame = bargains[[col for col in SCAN_BARGAIN_FIELDS if col in bargains.columns]].copy()
+            frame['areaGroup'] = frame['areaGroup'].astype(str)
+            frame.insert(0, 'complex_no', complex_no)
+            frame.insert(1, 'complex_name', names.get(complex_no))
+            frames.append(frame)
 
-    mean_prices, count_by_area = nre.analyze_area_stats(df)
-    bargains_df = nre.find_bargains(df)
-    
-    return jsonify({
-        "all_sales": df.to_dict(orient='records'),
-        "mean_prices": mean_prices,
-        "count_by_area": count_by_area,
-        "bargains": bargains_df.to_dict(orient='records')
-    })
+    ranked = nre.rank_bargains(frames, limit).to_dict(orient='records')
+
+    return stream_json([json_response.dumps({
+        "bargains": ranked,
+        "complexes": complexes,
+        "failures": failures,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    })], request)
+
+# --- 찜한 단지 API ---
+@app.route('/api/favorites', methods=['GET', 'POST'])
+@login_required
+def favorites():
+    if request.method == 'GET':
+        return jsonify([{
+            'id': fav.id,
+            'complex_no': fav.complex_no,
+            'complex_name': fav.complex_name,
+            'trade_type': fav.trade_type,
+            'created_at': fav.created_at.isoformat(),
+        } for fav in Favorite.query.filter_by(user_id=current_user.id).order_by(Favorite.created_at.desc())])
+
+    data = request.get_json() or {}
+    complex_no = str(data.get('complex_no') or '')
+    trade_type = data.get('trade_type', 'A1')
+    if not complex_no:
+        return jsonify({"message": "complex_no is required."}), 400
+    if Favorite.query.filter_by(user_id=current_user.id, complex_no=complex_no, trade_type=trade_type).first():
+        return jsonify({"message": "Already in favorites."}), 409
+    fav = Favorite(user_id=current_user.id, complex_no=complex_no, trade_type=trade_type,
+                   complex_name=data.get('complex_name'))
+    db.session.add(fav)
+    db.session.commit()
+    return jsonify({"message": "Favorite added", "id": fav.id}), 201
+
+@app.route('/api/favorites/<int:favorite_id>', methods=['DELETE'])
+@login_required
+def delete_favorite(favorite_id):
+    deleted = Favorite.query.filter_by(id=favorite_id, user_id=current_user.id).delete()
+    db.session.commit()
+    if not deleted:
+        return jsonify({"message": "Favorite not found."}), 404
+    return jsonify({"message": "Favorite removed"})
 
 # --- React 앱 서빙 ---
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    if path != "" and os.path.exists(app.static_folder + '/' + path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+    # 빌드된 프론트엔드는 시작 시 만든 manifest에서 바로 응답합니다 (미리 압축, 지문 기반 캐시 헤더).
+    return static_manifest.response(path, request)
 
 # --- 헬스체크 ---
 @app.route('/api/health/db')
@@ -338,10 +1061,104 @@ def health_db():
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)[:200]}), 500
 
+def _metrics_authorized():
+    return not METRICS_TOKEN or request.headers.get('Authorization') == f'Bearer {METRICS_TOKEN}'
+
+@app.route('/api/metrics')
+def metrics_endpoint():
+    """Prometheus 텍스트 포맷 메트릭 (이 워커 프로세스 기준)."""
+    if not _metrics_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/health/upstreams')
+def health_upstreams():
+    """외부 API별 서킷 상태와 요청/실패/재시도 횟수를 반환합니다."""
+    return jsonify(http_client.stats())
+
+@app.route('/api/health/jobs')
+def health_jobs():
+    """현재 스케줄러 리더와 최근 예약 작업 실행 이력을 반환합니다."""
+    if not _metrics_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+    lease = db.session.get(SchedulerLease, SCHEDULER_LEASE_NAME)
+    runs = JobRun.query.order_by(JobRun.started_at.desc()).limit(20).all()
+    return jsonify({
+        'instance': scheduler_instance_id(),
+        'leader': lease.holder if lease and lease.expires_at > datetime.utcnow() else None,
+        'lease_expires_at': lease.expires_at.isoformat() if lease else None,
+        'runs': [{
+            'job': run.job_name,
+            'holder': run.holder,
+            'started_at': run.started_at.isoformat(),
+            'duration_ms': run.duration_ms,
+            'status': run.status,
+            'detail': run.detail,
+        } for run in runs],
+    })
+
 # --- 텔레그램 알림 작업 ---
+# 사용자 주소 → odcloud SUBSCRPT_AREA_CODE_NM. 도 단위 명칭을 광역시보다 먼저 검사합니다.
+# (예: '경기도 광주시'는 '광주'가 아니라 '경기')
+REGION_ALIASES = [
+    ('서울', '서울'), ('경기', '경기'), ('강원', '강원'),
+    ('충청북도', '충북'), ('충북', '충북'), ('충청남도', '충남'), ('충남', '충남'),
+    ('전라북도', '전북'), ('전북', '전북'), ('전라남도', '전남'), ('전남', '전남'),
+    ('경상북도', '경북'), ('경북', '경북'), ('경상남도', '경남'), ('경남', '경남'),
+    ('제주', '제주'), ('세종', '세종'),
+    ('인천', '인천'), ('부산', '부산'), ('대구', '대구'), ('광주', '광주'), ('대전', '대전'), ('울산', '울산'),
+]
+
+def normalize_region(address):
+    """사용자 주소 문자열을 공고의 지역명으로 변환합니다. 알 수 없으면 None."""
+    if not address:
+        return None
+    for alias, region in REGION_ALIASES:
+        if alias in address:
+            return region
+    return None
+
+def build_notification_message(user, apt):
+    return f"🔔 신규 청약 알림 ({user.address})\n\n" \
+           f"단지명: {apt['HOUSE_NM']}\n" \
+           f"접수기간: {apt['RCEPT_BGNDE']} ~ {apt['RCEPT_ENDDE']}\n" \
+           f"공고 URL: {apt.get('PBLANC_URL', 'N/A')}"
+
+def announcement_key(apt):
+    return f"{apt.get('HOUSE_MANAGE_NO') or ''}:{apt.get('PBLANC_NO') or ''}"
+
+def load_sent_pairs(keys):
+    """주어진 공고들에 대해 이미 발송된 (user_id, announcement_key) 집합을 불러옵니다."""
+    keys = list(keys)
+    sent = set()
+    for i in range(0, len(keys), NOTIFICATION_BATCH_SIZE):
+        sent.update(db.session.query(NotificationLedger.user_id, NotificationLedger.announcement_key)
+                    .filter(NotificationLedger.announcement_key.in_(keys[i:i + NOTIFICATION_BATCH_SIZE])))
+    return sent
+
+def prune_notification_ledger():
+    """접수 마감일이 지난 공고의 발송 이력을 삭제합니다."""
+    deleted = NotificationLedger.query.filter(NotificationLedger.rcept_endde < date.today()) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+def save_notifications(rows):
+    """
+    발송된 알림과 발송 이력을 NOTIFICATION_BATCH_SIZE 단위로 나눠 bulk insert 합니다.
+    rows의 각 항목은 {'notification': {...}, 'ledger': {...}} 형태입니다.
+    """
+    for i in range(0, len(rows), NOTIFICATION_BATCH_SIZE):
+        batch = rows[i:i + NOTIFICATION_BATCH_SIZE]
+        db.session.execute(insert(Notification), [row['notification'] for row in batch])
+        db.session.execute(insert(NotificationLedger), [row['ledger'] for row in batch])
+        db.session.commit()
+
 async def async_send_telegram_notifications():
     """
     (비동기) 새로운 청약 공고를 확인하고 조건에 맞는 사용자에게 텔레그램 알림을 보냅니다.
+    사용자를 지역별로 한 번만 묶고, 지역마다 공고를 한 번에 매칭해 발송 목록을 만듭니다.
+    발송 이력(NotificationLedger)에 있는 (사용자, 공고) 쌍은 다시 보내지 않습니다.
     """
     with app.app_context():
         logging.info("Running async job: async_send_telegram_notifications")
@@ -351,8 +1168,10 @@ async def async_send_telegram_notifications():
             return
 
         try:
-            bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
-            all_new_apts = filter_apts_by_date(get_apartments_by_region(None))
+            pruned = prune_notification_ledger()
+            logging.info(f"Pruned {pruned} expired ledger entries.")
+
+            all_new_apts = get_open_apartments(None)
             logging.info(f"Found {len(all_new_apts)} new apartments.")
 
             users_to_notify = User.query.filter(User.telegram_chat_id.isnot(None), User.address.isnot(None)).all()
@@ -362,68 +1181,500 @@ async def async_send_telegram_notifications():
                 logging.info("No new apartments or no users to notify. Job finished.")
                 return
 
+            users_by_region = defaultdict(list)
             for user in users_to_notify:
-                user_region = None
-                if '서울' in user.address:
-                    user_region = '서울'
-                elif '경기' in user.address:
-                    user_region = '경기'
-                
+                user_region = normalize_region(user.address)
                 if not user_region:
-                    logging.warning(f"Skipping user {user.id} because their address '{user.address}' is not '서울' or '경기'.")
+                    logging.warning(f"Skipping user {user.id} because their address '{user.address}' has no known region.")
                     continue
-                
-                logging.info(f"Processing user {user.id} for region {user_region}.")
-                sent_count = 0
-                for apt in all_new_apts:
-                    if apt.get('SUBSCRPT_AREA_CODE_NM') == user_region:
-                        message = f"🔔 신규 청약 알림 ({user.address})\n\n" \
-                                  f"단지명: {apt['HOUSE_NM']}\n" \
-                                  f"접수기간: {apt['RCEPT_BGNDE']} ~ {apt['RCEPT_ENDDE']}\n" \
-                                  f"공고 URL: {apt.get('PBLANC_URL', 'N/A')}"
-                        try:
-                            await bot.send_message(chat_id=user.telegram_chat_id, text=message)
-                            
-                            # Save notification to DB
-                            new_notif = Notification(
-                                user_id=user.id,
-                                message=message,
-                                url=apt.get('PBLANC_URL', '#')
-                            )
-                            db.session.add(new_notif)
-                            
-                            logging.info(f"SUCCESS: Sent notification to user {user.id} for apt {apt['HOUSE_NM']}")
-                            sent_count += 1
-                        except Exception as e:
-                            logging.error(f"FAILED to send message to user {user.id}: {e}")
-            
-            if sent_count > 0:
-                db.session.commit()
-                logging.info("Committed new notifications to the database.")
-                if sent_count == 0:
-                    logging.info(f"No matching apartments found for user {user.id} in region {user_region}.")
+                users_by_region[user_region].append(user)
+
+            apts_by_region = defaultdict(list)
+            for apt in all_new_apts:
+                apts_by_region[apt.get('SUBSCRPT_AREA_CODE_NM')].append(apt)
+
+            messages = []
+            skipped = 0
+            for region, users in users_by_region.items():
+                region_apts = apts_by_region.get(region, [])
+                sent_pairs = load_sent_pairs({announcement_key(apt) for apt in region_apts})
+                for apt in region_apts:
+                    key = announcement_key(apt)
+                    for user in users:
+                        if (user.id, key) in sent_pairs:
+                            skipped += 1
+                            continue
+                        message = build_notification_message(user, apt)
+                        row = {
+                            'notification': {'user_id': user.id, 'message': message,
+                                             'url': apt.get('PBLANC_URL', '#'), 'is_read': False,
+                                             'announcement_key': key},
+                            'ledger': {'user_id': user.id, 'announcement_key': key,
+                                       'rcept_endde': _parse_date(apt.get('RCEPT_ENDDE'))},
+                        }
+                        messages.append((user.telegram_chat_id, message, row))
+            logging.info(f"Prepared {len(messages)} messages for {len(users_by_region)} regions "
+                         f"({skipped} already delivered).")
+
+            # python-telegram-bot은 무거우므로 알림 작업이 처음 실행될 때 import 합니다.
+            import telegram
+            from telegram.request import HTTPXRequest
+            from telegram_fanout import TelegramFanout
+
+            telegram_request = HTTPXRequest(connection_pool_size=TELEGRAM_SEND_CONCURRENCY)
+            async with telegram.Bot(token=TELEGRAM_BOT_TOKEN, base_url=TELEGRAM_API_BASE_URL,
+                                    request=telegram_request) as bot:
+                fanout = TelegramFanout(bot, concurrency=TELEGRAM_SEND_CONCURRENCY)
+                # 배치 단위로 발송하고 곧바로 기록해, 중간에 실패해도 보낸 알림은 남도록 합니다.
+                for i in range(0, len(messages), NOTIFICATION_BATCH_SIZE):
+                    delivered = await fanout.send(messages[i:i + NOTIFICATION_BATCH_SIZE])
+                    now = datetime.utcnow()
+                    for row in delivered:
+                        row['notification']['created_at'] = now
+                        row['ledger']['created_at'] = now
+                    save_notifications(delivered)
+
+            logging.info(f"Notification job finished: {fanout.stats.as_dict()}")
+            return fanout.stats.as_dict()
 
         except Exception as e:
+            db.session.rollback()
             logging.error(f"An error occurred in the notification job: {e}")
+            raise
 
 def send_telegram_notifications_job():
     """APScheduler가 호출할 동기 래퍼 함수."""
     logging.info("Scheduler triggered. Running async job via asyncio.run().")
-    asyncio.run(async_send_telegram_notifications())
+    return asyncio.run(async_send_telegram_notifications())
+
+
+# --- 알림 보존/압축 작업 ---
+NOTIFICATION_COLUMNS = (Notification.id, Notification.user_id, Notification.message, Notification.url,
+                        Notification.announcement_key, Notification.is_read, Notification.created_at)
+
+def _overflow_notification_ids(max_per_user):
+    """사용자별 최신 max_per_user건 밖에 있는 알림 id 목록."""
+    ranked = select(
+        Notification.id,
+        func.row_number().over(partition_by=Notification.user_id,
+                               order_by=(Notification.created_at.desc(), Notification.id.desc())).label('rank'),
+    ).subquery()
+    return db.session.execute(select(ranked.c.id).where(ranked.c.rank > max_per_user)).scalars().all()
+
+def _archive_notification_batch(rows, export):
+    now = datetime.utcnow()
+    db.session.execute(insert(NotificationArchive), [{
+        'notification_id': row.id, 'user_id': row.user_id, 'announcement_key': row.announcement_key, 'url': row.url,
+        'is_read': row.is_read, 'created_at': row.created_at, 'archived_at': now,
+    } for row in rows])
+    db.session.execute(delete(Notification).where(Notification.id.in_([row.id for row in rows])))
+    db.session.commit()
+    # 커밋된 배치만 내보내, 실패해 롤백된 알림이 파일에 남지 않도록 합니다.
+    if export is not None:
+        for row in rows:
+            export.write(json.dumps(dict(row._mapping), ensure_ascii=False, default=str) + '\n')
+    return len(rows)
+
+def _vacuum_notifications():
+    """옮긴 뒤 빈 공간을 회수하고 통계를 갱신합니다. VACUUM은 트랜잭션 밖에서 실행해야 합니다."""
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text('VACUUM (ANALYZE) notification'))
+        else:
+            # SQLite의 VACUUM은 DB 파일 전체를 다시 쓰며 쓰기를 막으므로 통계만 갱신합니다 (빈 페이지는 재사용됩니다).
+            conn.execute(text('ANALYZE notification'))
+
+def compact_notifications():
+    """
+    보존 정책(NOTIFICATION_RETENTION_DAYS, NOTIFICATION_MAX_PER_USER)을 벗어난 알림을
+    NOTIFICATION_BATCH_SIZE 단위로 NotificationArchive에 옮기고 Notification에서 삭제한 뒤 VACUUM/ANALYZE 합니다.
+    """
+    with app.app_context():
+        stats = {'archived_by_age': 0, 'archived_by_count': 0, 'export_file': None}
+        export = None
+        if NOTIFICATION_EXPORT_DIR:
+            os.makedirs(NOTIFICATION_EXPORT_DIR, exist_ok=True)
+            stats['export_file'] = os.path.join(
+                NOTIFICATION_EXPORT_DIR, f"notifications-{datetime.utcnow():%Y%m%d%H%M%S}.jsonl.gz")
+            export = gzip.open(stats['export_file'], 'wt', encoding='utf-8')
+        try:
+            if NOTIFICATION_RETENTION_DAYS > 0:
+                cutoff = datetime.utcnow() - timedelta(days=NOTIFICATION_RETENTION_DAYS)
+                while True:
+                    rows = db.session.execute(
+                        select(*NOTIFICATION_COLUMNS).where(Notification.created_at < cutoff)
+                        .order_by(Notification.id).limit(NOTIFICATION_BATCH_SIZE)
+                    ).all()
+                    if not rows:
+                        break
+                    stats['archived_by_age'] += _archive_notification_batch(rows, export)
+
+            if NOTIFICATION_MAX_PER_USER > 0:
+                ids = _overflow_notification_ids(NOTIFICATION_MAX_PER_USER)
+                for i in range(0, len(ids), NOTIFICATION_BATCH_SIZE):
+                    rows = db.session.execute(
+                        select(*NOTIFICATION_COLUMNS).where(Notification.id.in_(ids[i:i + NOTIFICATION_BATCH_SIZE]))
+                    ).all()
+                    if rows:
+                        stats['archived_by_count'] += _archive_notification_batch(rows, export)
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            if export is not None:
+                export.close()
+                if not (stats['archived_by_age'] or stats['archived_by_count']):
+                    os.remove(stats['export_file'])
+                    stats['export_file'] = None
+
+        if stats['archived_by_age'] or stats['archived_by_count']:
+            _vacuum_notifications()
+        logging.info(f"Notification compaction: {stats}")
+        return stats
+
+
+# --- 시세 추이 집계 ---
+def period_start(day, period):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+def record_price_history(complex_no, trade_type, stats, day=None):
+    """
+    compute_area_stats 결과(면적별 count/mean/median/min)를 그날이 속한 일/주/월 행에 합칩니다.
+    호출한 쪽에서 commit 합니다. 반영한 행 수를 반환합니다.
+    """
+    if stats.empty:
+        return 0
+    day = day or date.today()
+    starts = {period: period_start(day, period) for period in PRICE_HISTORY_PERIODS}
+    existing = {
+        (row.period, row.area_key): row
+        for row in PriceHistory.query.filter(
+            PriceHistory.complex_no == complex_no, PriceHistory.trade_type == trade_type,
+            or_(*(and_(PriceHistory.period == period, PriceHistory.period_start == start)
+                  for period, start in starts.items())))
+    }
+    new_rows = []
+    for area_key, count, mean, median, min_price in zip(
+            stats.index, stats['count'], stats['mean'], stats['median'], stats['min']):
+        area_key = int(area_key)
+        for period, start in starts.items():
+            row = existing.get((period, area_key))
+            if row is None:
+                new_rows.append({
+                    'complex_no': complex_no, 'trade_type': trade_type, 'period': period, 'period_start': start,
+                    'area_key': area_key, 'samples': 1, 'listings': float(count), 'mean_price': float(mean),
+                    'median_price': float(median), 'min_price': int(min_price),
+                })
+                continue
+            n = row.samples
+            row.listings = (row.listings * n + float(count)) / (n + 1)
+            row.mean_price = (row.mean_price * n + float(mean)) / (n + 1)
+            row.median_price = (row.median_price * n + float(median)) / (n + 1)
+            row.min_price = min(row.min_price, int(min_price))
+            row.samples = n + 1
+    if new_rows:
+        db.session.execute(insert(PriceHistory), new_rows)
+    return len(stats) * len(starts)
+
+def prune_price_history():
+    """보관 기간이 지난 일 단위 집계를 삭제합니다. 주/월 단위 집계는 남깁니다."""
+    cutoff = date.today() - timedelta(days=PRICE_HISTORY_DAILY_RETENTION_DAYS)
+    deleted = PriceHistory.query.filter(PriceHistory.period == 'day', PriceHistory.period_start < cutoff) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+# --- 찜한 단지 매물 감시 작업 ---
+def diff_listings(complex_no, trade_type, current):
+    """
+    현재 매물(nre.listing_hashes 결과)을 저장된 스냅샷과 비교해 바뀐 행만 DB에 반영하고 변동 내역을 반환합니다.
+    스냅샷이 없던 단지는 기준선만 저장하고 변동으로 보지 않습니다.
+    """
+    stored = {
+        article_no: (content_hash, price_num, summary)
+        for article_no, content_hash, price_num, summary in db.session.query(
+            ListingSnapshot.article_no, ListingSnapshot.content_hash, ListingSnapshot.price_num, ListingSnapshot.summary
+        ).filter_by(complex_no=complex_no, trade_type=trade_type)
+    }
+    first_run = not stored
+    now = datetime.utcnow()
+    added, changed, price_changes = [], [], []
+    for article_no, content_hash, price_num, summary in zip(
+            current.index, current['content_hash'].tolist(), current['price_num'].tolist(), current['summary'].tolist()):
+        row = {'complex_no': complex_no, 'trade_type': trade_type, 'article_no': article_no,
+               'content_hash': content_hash, 'price_num': price_num, 'summary': summary, 'updated_at': now}
+        previous = stored.pop(article_no, None)
+        if previous is None:
+            added.append(row)
+        elif previous[0] != content_hash:
+            changed.append(row)
+            if previous[1] != price_num:
+                price_changes.append((summary, previous[1], price_num))
+    removed = list(stored.items())
+
+    if added:
+        db.session.execute(insert(ListingSnapshot), added)
+    if changed:
+        db.session.execute(update(ListingSnapshot), changed)
+    if removed:
+        ListingSnapshot.query.filter(
+            ListingSnapshot.complex_no == complex_no, ListingSnapshot.trade_type == trade_type,
+            ListingSnapshot.article_no.in_([article_no for article_no, _ in removed]),
+        ).delete(synchronize_session=False)
+
+    if first_run:
+        return None
+    return {
+        'added': [row['summary'] for row in added],
+        'removed': [summary for _, (_, _, summary) in removed],
+        'price_changes': price_changes,
+    }
+
+def build_listing_change_message(name, changes):
+    lines = [f"🏠 관심 단지 매물 변동 ({name})",
+             f"신규 {len(changes['added'])}건 · 가격 변경 {len(changes['price_changes'])}건 · 삭제 {len(changes['removed'])}건", ""]
+    for summary in changes['added'][:LISTING_ALERT_MAX_LINES]:
+        lines.append(f"[신규] {summary}")
+    for summary, old_price, new_price in changes['price_changes'][:LISTING_ALERT_MAX_LINES]:
+        lines.append(f"[가격] {summary} ({old_price:,} → {new_price:,}만원)")
+    for summary in changes['removed'][:LISTING_ALERT_MAX_LINES]:
+        lines.append(f"[삭제] {summary}")
+    return "\n".join(lines)
+
+def watch_favorite_listings():
+    """
+    찜한 단지들의 매물을 동시에 조회해 스냅샷과 비교하고, 신규/삭제/가격 변경이 있으면
+    해당 단지를 찜한 사용자들에게 Notification을 남깁니다.
+    """
+    with app.app_context():
+        started = time.perf_counter()
+        watchers = defaultdict(list)
+        names = {}
+        for fav in Favorite.query.all():
+            watchers[(fav.complex_no, fav.trade_type)].append(fav.user_id)
+            names.setdefault(fav.complex_no, fav.complex_name or fav.complex_no)
+        if not watchers:
+            return {'complexes': 0, 'changed': 0, 'notifications': 0}
+
+        futures = {key: scan_executor.submit(get_sales_frame, *key) for key in watchers}
+        notifications, changed_complexes, history_rows = [], 0, 0
+        for (complex_no, trade_type), future in futures.items():
+            try:
+                df = future.result()
+            except nre.FetchError as e:
+                # 일부 페이지만 받은 목록과 비교하면 없어진 적 없는 매물이 [삭제] 후 [신규]로 알려지므로,
+                # 스냅샷·호가 이력을 건드리지 않고 다음 실행에서 다시 비교합니다.
+                logging.warning(f"Listing watch skipped for complex {complex_no}: {e}")
+                continue
+            except Exception as e:
+                logging.error(f"Listing watch failed for complex {complex_no}: {e}")
+                continue
+            if df.empty:
+                # 네이버가 차단 등으로 빈 목록을 돌려주는 경우와 구분되지 않으므로 전체 삭제로 처리하지 않습니다.
+                continue
+            try:
+                history_rows += record_price_history(complex_no, trade_type, nre.compute_area_stats(df))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Failed to record price history for complex {complex_no}: {e}")
+            try:
+                changes = diff_listings(complex_no, trade_type, nre.listing_hashes(df))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Failed to store listing snapshot for complex {complex_no}: {e}")
+                continue
+            if not changes or not any(changes.values()):
+                continue
+            changed_complexes += 1
+            message = build_listing_change_message(names[complex_no], changes)
+            url = f"https://new.land.naver.com/complexes/{complex_no}"
+            for user_id in watchers[(complex_no, trade_type)]:
+                notifications.append({'user_id': user_id, 'message': message, 'url': url,
+                                      'is_read': False, 'created_at': datetime.utcnow()})
+
+        for i in range(0, len(notifications), NOTIFICATION_BATCH_SIZE):
+            db.session.execute(insert(Notification), notifications[i:i + NOTIFICATION_BATCH_SIZE])
+            db.session.commit()
+        pruned_history = prune_price_history()
+        logging.info(f"Listing watch: complexes={len(watchers)} changed={changed_complexes} "
+                     f"notifications={len(notifications)} history_rows={history_rows} "
+                     f"elapsed={time.perf_counter() - started:.1f}s")
+        return {'complexes': len(watchers), 'changed': changed_complexes, 'notifications': len(notifications),
+                'history_rows': history_rows, 'pruned_history': pruned_history}
+
+
+# --- 스케줄러 리더 선출 ---
+# 모든 워커가 스케줄러를 띄우지만, DB 임대(SchedulerLease)를 가진 한 프로세스만 예약 작업을 실행합니다.
+# 리더가 죽어 임대가 만료되면 다음 하트비트에서 다른 워커가 임대를 넘겨받습니다.
+SCHEDULER_LEASE_NAME = 'scheduler'
+_leadership = {'is_leader': False}
+
+def scheduler_instance_id():
+    # fork 이후 워커마다 달라지도록 호출 시점의 pid를 사용합니다.
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def acquire_scheduler_lease():
+    """
+    리더 임대를 획득하거나 갱신하고, 이 프로세스가 리더인지 반환합니다.
+    현재 보유자이거나 임대가 만료된 경우에만 성공하는 조건부 UPDATE 한 번으로 처리하므로
+    PostgreSQL과 SQLite 모두에서 동시에 한 프로세스만 리더가 됩니다.
+    """
+    holder = scheduler_instance_id()
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=SCHEDULER_LEASE_TTL_SECONDS)
+    with app.app_context():
+        try:
+            result = db.session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == SCHEDULER_LEASE_NAME,
+                       or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+                .values(holder=holder, expires_at=expires_at)
+            )
+            if result.rowcount == 0:
+                if db.session.get(SchedulerLease, SCHEDULER_LEASE_NAME) is not None:
+                    db.session.rollback()
+                    return False
+                # 첫 실행: 임대 행을 만든 프로세스가 리더가 됩니다. 동시에 만들면 PK 충돌로 한쪽만 성공합니다.
+                db.session.add(SchedulerLease(name=SCHEDULER_LEASE_NAME, holder=holder, expires_at=expires_at))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Failed to acquire scheduler lease: {e}")
+            return False
+
+def release_scheduler_lease():
+    """정상 종료 시 임대를 바로 만료시켜 다른 워커가 TTL을 기다리지 않고 넘겨받게 합니다."""
+    with app.app_context():
+        try:
+            db.session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == SCHEDULER_LEASE_NAME, SchedulerLease.holder == scheduler_instance_id())
+                .values(expires_at=datetime.utcnow())
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Failed to release scheduler lease: {e}")
+
+def scheduler_heartbeat():
+    is_leader = acquire_scheduler_lease()
+    if is_leader != _leadership['is_leader']:
+        logging.info(f"Scheduler leadership {'acquired' if is_leader else 'lost'} by {scheduler_instance_id()}.")
+    _leadership['is_leader'] = is_leader
+
+# 예외 메시지에 섞인 요청 URL의 쿼리 문자열(serviceKey 등)과 key=value 형태의 비밀값
+SECRET_PATTERN = re.compile(r'\?\S*|\b\w*(?:key|token|secret|password)\w*=\S+', re.IGNORECASE)
+
+def describe_error(e):
+    """JobRun.detail과 로그에 남길 예외 설명. 쿼리 문자열과 비밀값을 지웁니다."""
+    return f"{type(e).__name__}: {SECRET_PATTERN.sub('', str(e))}"[:1000]
+
+def run_scheduled_job(name, func):
+    """
+    리더일 때만 func를 실행하고 JobRun에 소요 시간과 결과를 기록합니다.
+    func가 반환한 통계 dict는 detail에, 예외는 failed 상태와 함께 오류 메시지로 남깁니다.
+    """
+    # 하트비트 사이에 임대를 잃었을 수 있으므로 실행 직전에 다시 확인(갱신)합니다.
+    if not acquire_scheduler_lease():
+        logging.info(f"Skipping job {name}: {scheduler_instance_id()} is not the scheduler leader.")
+        return None
+
+    holder = scheduler_instance_id()
+    with app.app_context():
+        run = JobRun(job_name=name, holder=holder, started_at=datetime.utcnow(), status='running')
+        db.session.add(run)
+        db.session.commit()
+        run_id = run.id
+
+    started = time.perf_counter()
+    status, detail, result = 'success', None, None
+    try:
+        result = func()
+        if result is not None:
+            detail = json.dumps(result, ensure_ascii=False, default=str)
+    except Exception as e:
+        status, detail = 'failed', describe_error(e)
+        logging.error(f"Scheduled job {name} failed: {detail}")
+    elapsed = time.perf_counter() - started
+    duration_ms = int(elapsed * 1000)
+    metrics.JOB_SECONDS.observe(elapsed, job=name, status=status)
+
+    with app.app_context():
+        try:
+            db.session.execute(
+                update(JobRun).where(JobRun.id == run_id)
+                .values(finished_at=datetime.utcnow(), duration_ms=duration_ms, status=status, detail=detail)
+            )
+            cutoff = datetime.utcnow() - timedelta(days=JOB_RUN_RETENTION_DAYS)
+            JobRun.query.filter(JobRun.started_at < cutoff).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Failed to record run of job {name}: {e}")
+    logging.info(f"Scheduled job {name} finished: status={status} duration={duration_ms}ms")
+    return result
+
+def scheduled(name, func):
+    """APScheduler에 등록할, 리더 확인과 실행 이력 기록을 감싼 함수를 만듭니다."""
+    def job():
+        return run_scheduled_job(name, func)
+    job.__name__ = name
+    return job
+
+
+# --- 캐시 워밍 ---
+# 배포 직후 첫 요청이 느리지 않도록 공고를 동기화하고 전국 스냅샷을 미리 채웁니다.
+# 동기화는 리더만 수행하고, 스냅샷 워밍은 각 워커가 로컬 테이블에서 채웁니다.
+def warm_feed():
+    run_scheduled_job('sync_announcements', sync_announcements)
+    feed_cache.warm([None])
+
+threading.Thread(target=warm_feed, daemon=True).start()
+# 단지 검색 인덱스는 워커마다 CPU와 메모리를 쓰므로 미리 만들지 않고 첫 검색 때 만듭니다.
 
 
 # --- 스케줄러 설정 ---
-# waitress 같은 프로덕션 서버에서 실행될 때 스케줄러를 시작합니다.
-# Flask 개발 서버의 reloader는 스케줄러를 두 번 실행할 수 있으므로,
-# if __name__ == '__main__' 블록 밖에서, debug=False 환경을 가정하고 설정합니다.
-if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+def start_scheduler():
+    from apscheduler.schedulers.background import BackgroundScheduler
+
     scheduler = BackgroundScheduler(daemon=True)
+    # 리더 임대 갱신. 시작하자마자 한 번 실행해 리더를 정합니다.
+    scheduler.add_job(scheduler_heartbeat, 'interval', seconds=SCHEDULER_LEASE_RENEW_SECONDS,
+                      next_run_time=datetime.now())
+    # 아래 작업들은 모든 워커에 등록되지만 실제 실행은 리더 한 곳에서만 일어납니다.
+    notification_job = scheduled('send_telegram_notifications', send_telegram_notifications_job)
     # 매일 오전 9시에 실행되도록 설정 (테스트를 위해 간격을 줄일 수 있음)
-    scheduler.add_job(send_telegram_notifications_job, 'cron', hour=9)
+    scheduler.add_job(notification_job, 'cron', hour=9)
+    # 주기적으로 odcloud 공고를 로컬 테이블로 동기화
+    scheduler.add_job(scheduled('sync_announcements', sync_announcements), 'interval', minutes=FEED_SYNC_INTERVAL_MINUTES)
+    # 보존 기간이 지난 알림을 아카이브로 옮기고 테이블 정리 (매일 새벽 4시)
+    scheduler.add_job(scheduled('compact_notifications', compact_notifications), 'cron', hour=4)
+    # 찜한 단지 매물 변동 감시
+    scheduler.add_job(scheduled('watch_favorite_listings', watch_favorite_listings), 'interval',
+                      minutes=LISTING_WATCH_INTERVAL_MINUTES)
     # 즉시 1회 실행 (테스트용)
-    scheduler.add_job(send_telegram_notifications_job, 'date', run_date=datetime.now() + timedelta(seconds=10))
+    scheduler.add_job(notification_job, 'date', run_date=datetime.now() + timedelta(seconds=10))
     scheduler.start()
-    logging.info("Scheduler started.")
+    atexit.register(release_scheduler_lease)
+    logging.info(f"Scheduler started on {scheduler_instance_id()}.")
+    return scheduler
+
+# waitress 같은 프로덕션 서버에서 실행될 때 스케줄러를 시작합니다.
+# Flask 개발 서버의 reloader는 스케줄러를 두 번 실행할 수 있으므로,
+# if __name__ == '__main__' 블록 밖에서, debug=False 환경을 가정하고 설정합니다.
+if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+    scheduler = start_scheduler()
 
 
 if __name__ == '__main__':
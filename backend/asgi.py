@@ -0,0 +1,142 @@
+"""
+ASGI 진입점. 기존 Flask 앱(app.py)을 그대로 서비스하면서, 네이버 매물을 조회하는 라우트는
+업스트림 응답을 이벤트 루프에서 기다린 뒤 Flask 뷰에 넘깁니다.
+
+    uvicorn --app-dir backend asgi:app --host 0.0.0.0 --port $PORT
+
+- /api/apartments/<complex_no>/sales, /analysis, /api/apartments/bargains/scan:
+  매물 페이지를 httpx(AsyncUpstream)로 받아 DataFrame을 만든 다음 요청 컨텍스트(app.prefetched_frames)와
+  sales_cache에 넣어 두므로, 스레드는 캐시된 DataFrame을 직렬화하는 짧은 동안만 쓰입니다.
+  수백 개의 조회가 동시에 진행돼도 스레드 수(ASGI_WSGI_THREADS)에 묶이지 않습니다.
+- 나머지 라우트(로그인, 프로필, /api/recommendations, /api/calendar_events 등)는 a2wsgi 스레드 풀에서
+  기존 동기 뷰로 실행됩니다. 공고 관련 라우트는 이미 로컬 DB/스냅샷 캐시만 읽습니다.
+
+waitress로 띄우는 기존 WSGI 진입점(Procfile의 backend.app:app)도 그대로 동작합니다.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+import app as flask_app
+import http_client
+import naver_real_estate as nre
+
+# 동기 뷰를 실행하는 스레드 수. 업스트림을 기다리는 동안에는 스레드를 쓰지 않으므로 작게 두어도 됩니다.
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 16))
+
+SALES_ROUTE = re.compile(r'^/api/apartments/(?P<complex_no>[^/]+)/(?:sales|analysis)$')
+SCAN_ROUTE = '/api/apartments/bargains/scan'
+
+wsgi_app = WSGIMiddleware(flask_app.app, workers=ASGI_WSGI_THREADS)
+
+# 같은 (단지, 거래 유형)을 동시에 요청하면 네이버 조회는 한 번만 합니다 (루프 내부 single-flight).
+_inflight = {}
+
+
+async def _load_frame(key):
+    complex_no, trade_type = key
+    articles = await nre.async_fetch_articles_with_fallback(complex_no, trade_type)
+    # DataFrame 변환은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    df = await asyncio.to_thread(nre.get_sales_dataframe, articles)
+    if not df.empty:
+        flask_app.sales_cache.set(key, df)
+    return df
+
+
+async def prefetch_sales_frame(complex_no, trade_type):
+    """단지의 매물 DataFrame을 비동기로 준비합니다. 캐시에 있으면 업스트림을 호출하지 않습니다."""
+    key = (complex_no, trade_type)
+    df = flask_app.sales_cache.get(key)
+    if df is not None:
+        return df
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.ensure_future(_load_frame(key))
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _prefetch(keys):
+    frames = {}
+    results = await asyncio.gather(*(prefetch_sales_frame(*key) for key in keys), return_exceptions=True)
+    for key, result in zip(keys, results):
+        if isinstance(result, nre.FetchError):
+            # 두 API 모두 실패한 단지는 다시 조회하지 않고 get_sales_frame이 같은 오류를 보고합니다.
+            frames[key] = result
+        elif isinstance(result, BaseException):
+            # 그 밖의 실패는 동기 경로(get_sales_frame)가 다시 시도하고 오류를 보고합니다.
+            logging.warning(f"Async prefetch failed for complex {key[0]}: {result!r}")
+        else:
+            frames[key] = result
+    return frames
+
+
+async def _read_body(receive):
+    chunks, more = [], True
+    while more:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        more = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+def _replay(body):
+    """이미 읽은 요청 본문을 WSGI 쪽에 다시 넘겨주는 receive."""
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {'type': 'http.disconnect'}
+        sent = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return receive
+
+
+def _scan_targets(body):
+    try:
+        data = json.loads(body or b'{}') or {}
+        complex_nos, _ = flask_app.resolve_scan_targets(data)
+        return [(no, data.get('trade_type', 'A1')) for no in complex_nos]
+    except (TypeError, ValueError, AttributeError):
+        return []  # 잘못된 요청은 Flask 뷰가 400으로 응답합니다.
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await http_client.aclose_all()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return await wsgi_app(scope, receive, send)
+
+    keys = []
+    match = SALES_ROUTE.match(scope['path'])
+    if match and scope['method'] == 'GET':
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        keys = [(match.group('complex_no'), query.get('trade_type', ['A1'])[0])]
+    elif scope['path'] == SCAN_ROUTE and scope['method'] == 'POST':
+        body = await _read_body(receive)
+        receive = _replay(body)
+        keys = _scan_targets(body)
+
+    if keys:
+        # a2wsgi는 contextvars를 복사해 뷰를 실행하므로 이 값이 get_sales_frame까지 전달됩니다.
+        flask_app.prefetched_frames.set(await _prefetch(keys))
+    await wsgi_app(scope, receive, send)
@@ -0,0 +1,182 @@
+"""
+대역 서버가 재생할 업스트림 응답.
+
+bench/recordings/<이름>.json 파일이 있으면 실제로 녹화한 응답을 그대로 재생하고,
+없으면 같은 형태의 결정적(시드 고정) 합성 응답을 만듭니다.
+페이지 응답(naver_*_page, odcloud_page)의 녹화 파일은 페이지 순서대로의 목록(또는 1페이지 응답 하나)이며,
+녹화한 마지막 페이지에서 "더 없음"으로 끝나도록 고쳐 재생합니다.
+    odcloud_page, naver_pc_page, naver_mobile_page, kakao_token, kakao_me, telegram_send
+"""
+import json
+import os
+import random
+from datetime import date, timedelta
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings')
+PAGE_SIZE = 20
+
+REGIONS = ['서울', '경기', '인천', '부산', '대구', '광주', '대전', '울산', '세종', '강원',
+           '충북', '충남', '전북', '전남', '경북', '경남', '제주']
+BRANDS = ['래미안', '자이', '힐스테이트', '푸르지오', '아이파크', 'e편한세상', '롯데캐슬', '더샵', '센트럴', '파크뷰']
+DISTRICTS = ['강남구', '서초구', '송파구', '마포구', '성동구', '분당구', '수지구', '해운대구', '수성구', '유성구']
+DONGS = ['개포동', '대치동', '잠실동', '공덕동', '옥수동', '정자동', '풍덕천동', '우동', '범어동', '봉명동']
+AREAS = [59, 74, 84, 101, 114, 135]
+DIRECTIONS = ['남향', '남동향', '남서향', '동향', '서향']
+REALTORS = [f'벤치공인중개사{i}' for i in range(40)]
+FEATURES = ['올수리', '역세권', '급매', '로열층', '조망좋음', '']
+TAGS = [['25년이내', '대단지'], ['역세권'], ['급매', '남향'], []]
+
+
+def recorded(name):
+    """녹화된 응답이 있으면 반환합니다."""
+    path = os.path.join(RECORDINGS_DIR, f'{name}.json')
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def recorded_pages(name):
+    """녹화된 페이지 응답 목록. 파일에 응답 하나만 있으면 1페이지짜리로 봅니다."""
+    replay = recorded(name)
+    if replay is None:
+        return None
+    return replay if isinstance(replay, list) else [replay]
+
+
+def price_text(price):
+    """만원 단위 가격을 네이버 표기('12억 5,000', '9,800')로 바꿉니다."""
+    billions, rest = divmod(price, 10000)
+    if not billions:
+        return f"{rest:,}"
+    return f"{billions}억 {rest:,}" if rest else f"{billions}억"
+
+
+def _rng(*key):
+    # 문자열 시드는 PYTHONHASHSEED와 무관하게 실행마다 같은 난수열을 만듭니다.
+    return random.Random(repr(key))
+
+
+def _base_price(complex_no):
+    return 30000 + (int(complex_no) * 7919) % 150000
+
+
+def pc_articles(count, complex_no='1000', start=0):
+    """PC API 형태(articleList 항목)의 매물 count개."""
+    rng = _rng('pc', complex_no, start)
+    base = _base_price(complex_no)
+    articles = []
+    for i in range(start, start + count):
+        area = rng.choice(AREAS)
+        price = int(base * area / 84 * rng.uniform(0.85, 1.15)) // 100 * 100
+        top = rng.randint(10, 35)
+        articles.append({
+            'articleNo': f'{complex_no}{i:07d}',
+            'articleName': f'벤치단지{complex_no}',
+            'buildingName': f'{101 + i % 12}동',
+            'floorInfo': f'{rng.randint(1, top)}/{top}',
+            'dealOrWarrantPrc': price_text(price),
+            'areaName': f'{area}{rng.choice("AB")}',
+            'direction': rng.choice(DIRECTIONS),
+            'tradeTypeName': '매매',
+            'articleConfirmYmd': '20261001',
+            'articleFeatureDesc': rng.choice(FEATURES),
+            'tagList': rng.choice(TAGS),
+            'realtorName': rng.choice(REALTORS),
+        })
+    return articles
+
+
+def naver_pc_page(complex_no, page, total):
+    replay = recorded_pages('naver_pc_page')
+    if replay is not None:
+        if page > len(replay):
+            return {'isMoreData': False, 'articleList': []}
+        return dict(replay[page - 1], isMoreData=replay[page - 1].get('isMoreData', False) and page < len(replay))
+    start = (page - 1) * PAGE_SIZE
+    count = max(0, min(PAGE_SIZE, total - start))
+    return {'isMoreData': start + count < total, 'articleList': pc_articles(count, complex_no, start)}
+
+
+def naver_mobile_page(complex_no, page, total):
+    replay = recorded_pages('naver_mobile_page')
+    if replay is not None:
+        recorded_total = sum(len(p.get('result', {}).get('list', [])) for p in replay)
+        result = dict(replay[page - 1]['result']) if page <= len(replay) else {'list': []}
+        result.update(totAtclCnt=recorded_total, moreDataYn='Y' if page < len(replay) else 'N')
+        return {'result': result}
+    start = (page - 1) * PAGE_SIZE
+    count = max(0, min(PAGE_SIZE, total - start))
+    items = [{
+        'atclNo': art['articleNo'], 'atclNm': art['articleName'], 'bildNm': art['buildingName'],
+        'tradTpNm': art['tradeTypeName'], 'flrInfo': art['floorInfo'], 'prcInfo': art['dealOrWarrantPrc'],
+        'spc1': art['areaName'].rstrip('AB'), 'direction': art['direction'], 'cfmYmd': '26.10.01.',
+        'atclFetrDesc': art['articleFeatureDesc'], 'tagList': art['tagList'], 'rltrNm': art['realtorName'],
+    } for art in pc_articles(count, complex_no, start)]
+    return {'result': {'list': items, 'totAtclCnt': total, 'moreDataYn': 'Y' if start + count < total else 'N'}}
+
+
+def announcements(total, today=None):
+    """odcloud 청약 공고 total건. 절반 정도는 접수 중이도록 접수 기간을 오늘 전후로 분산합니다."""
+    today = today or date.today()
+    rng = _rng('odcloud', total)
+    rows = []
+    for i in range(total):
+        begin = today + timedelta(days=rng.randint(-40, 20))
+        rows.append({
+            'HOUSE_MANAGE_NO': f'2026{i:06d}',
+            'PBLANC_NO': f'2026{i:06d}',
+            'HOUSE_NM': f'{rng.choice(BRANDS)} 벤치{i}',
+            'SUBSCRPT_AREA_CODE_NM': rng.choice(REGIONS),
+            'HSSPLY_ADRES': f'{rng.choice(DISTRICTS)} {rng.choice(DONGS)} {i}',
+            'RCEPT_BGNDE': begin.isoformat(),
+            'RCEPT_ENDDE': (begin + timedelta(days=rng.randint(1, 30))).isoformat(),
+            'PBLANC_URL': f'https://www.applyhome.co.kr/bench/{i}',
+        })
+    return rows
+
+
+def odcloud_page(page, per_page, total):
+    replay = recorded_pages('odcloud_page')
+    if replay is not None:
+        rows = replay[page - 1].get('data', []) if page <= len(replay) else []
+        # 녹화한 페이지 수만큼만 요청되도록 totalCount를 맞춥니다.
+        return {'page': page, 'perPage': per_page, 'totalCount': len(replay) * per_page,
+                'currentCount': len(rows), 'data': rows}
+    rows = announcements(total)[(page - 1) * per_page:page * per_page]
+    return {'page': page, 'perPage': per_page, 'totalCount': total, 'currentCount': len(rows), 'data': rows}
+
+
+def kakao_token():
+    return recorded('kakao_token') or {'access_token': 'bench-access-token', 'token_type': 'bearer', 'expires_in': 21599}
+
+
+def kakao_me():
+    return recorded('kakao_me') or {'id': 4242, 'properties': {'nickname': '벤치사용자'}}
+
+
+def telegram_me():
+    return {'ok': True, 'result': {'id': 1, 'is_bot': True, 'first_name': 'bench', 'username': 'bench_bot',
+                                   'can_join_groups': False, 'can_read_all_group_messages': False,
+                                   'supports_inline_queries': False}}
+
+
+def telegram_send(message_id, chat_id, text, sent_at):
+    replay = recorded('telegram_send')
+    if replay is not None:
+        return replay
+    return {'ok': True, 'result': {'message_id': message_id, 'date': int(sent_at),
+                                   'chat': {'id': int(chat_id), 'type': 'private'}, 'text': text}}
+
+
+def complex_catalog(size, seed=0):
+    """complex_map.json 형태의 합성 단지 목록 {'시 구 동 단지명': 단지번호} size개."""
+    rng = random.Random(seed)
+    catalog = {}
+    i = 0
+    while len(catalog) < size:
+        name = (f"{rng.choice(REGIONS)}시 {rng.choice(DISTRICTS)} {rng.choice(DONGS)} "
+                f"{rng.choice(BRANDS)}{rng.choice(['', '퍼스티지', '센트럴', '리버뷰', '포레'])}{i % 97}차")
+        catalog.setdefault(name, str(100000 + i))
+        i += 1
+    return catalog
@@ -0,0 +1,394 @@
+"""
+오프라인 벤치마크 / 부하 테스트. 외부 API는 모두 로컬 대역 서버(bench.standin)로 대체됩니다.
+
+    cd backend
+    python -m bench.run                                  # 전체 스위트
+    python -m bench.run --quick                          # 작은 입력으로 빠르게
+    python -m bench.run --suites frames,search --output bench/results/latest.json
+    python -m bench.run --suites endpoints --latency-ms 80 --error-rate 0.05
+
+스위트
+    frames     get_sales_dataframe / compute_area_stats / find_bargains 처리량 (1k ~ 1M 행)
+    search     search_complexes 인덱스 구축 시간과 질의 지연 (실제 complex_map.json + 합성 대형 목록)
+    endpoints  waitress로 띄운 app에 동시 클라이언트로 요청했을 때의 처리량과 지연 분포
+    fanout     N명에게 텔레그램 알림을 보내는 데 걸리는 시간 (텔레그램 한도 적용 / 미적용)
+
+결과는 JSON으로 저장되어(기본 bench/results/) 실행 간 회귀 비교에 사용할 수 있습니다.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import partial
+
+from bench import fixtures
+from bench.standin import StandIn
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SUITES = ['frames', 'search', 'endpoints', 'fanout']
+
+FRAME_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+CATALOG_SIZES = [200_000, 1_000_000]
+CONCURRENCY_LEVELS = [1, 8, 32]
+REQUESTS_PER_LEVEL = 200
+FANOUT_USERS = [100, 1_000, 10_000]
+# 텔레그램 한도(초당 25건)를 적용한 실행은 시간이 N/25초 걸리므로 이 인원까지만 실제로 돌립니다.
+FANOUT_LIMITED_MAX_USERS = 250
+
+QUICK = {
+    'frame_sizes': [1_000, 10_000, 100_000],
+    'catalog_sizes': [100_000],
+    'concurrency': [1, 8],
+    'requests_per_level': 50,
+    'fanout_users': [100, 1_000],
+    'fanout_limited_max_users': 100,
+}
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def latency_summary(samples):
+    """초 단위 표본 목록 → ms 단위 p50/p95/p99/max/mean."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+    return {'count': len(ordered), 'mean_ms': _ms(statistics.fmean(ordered)), 'p50_ms': _ms(pct(50)),
+            'p95_ms': _ms(pct(95)), 'p99_ms': _ms(pct(99)), 'max_ms': _ms(ordered[-1])}
+
+
+def best_of(fn, repeat):
+    """fn을 repeat번 실행해 (최소 시간, 중앙값 시간, 마지막 결과)를 반환합니다."""
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), statistics.median(times), result
+
+
+# --- frames ---
+def bench_frames(args, standin):
+    import naver_real_estate as nre
+
+    results = []
+    for rows in args.frame_sizes:
+        articles = fixtures.pc_articles(rows, complex_no='1000')
+        repeat = args.repeat if rows <= 100_000 else 1
+        build_best, build_median, df = best_of(partial(nre.get_sales_dataframe, articles), repeat)
+        stats_best, _, stats = best_of(partial(nre.compute_area_stats, df), repeat)
+        entry = {
+            'rows': rows,
+            'frame_rows': len(df),
+            'frame_bytes': int(df.memory_usage(deep=True).sum()),
+            'get_sales_dataframe_ms': _ms(build_best),
+            'get_sales_dataframe_median_ms': _ms(build_median),
+            'rows_per_sec': round(rows / build_best),
+            'compute_area_stats_ms': _ms(stats_best),
+        }
+        for method in ('mean', 'median'):
+            best, _, bargains = best_of(partial(nre.find_bargains, df, method=method, stats=stats), repeat)
+            entry[f'find_bargains_{method}_ms'] = _ms(best)
+            entry[f'find_bargains_{method}_count'] = len(bargains)
+        results.append(entry)
+        print(f"  frames {rows:>9,} rows: dataframe {entry['get_sales_dataframe_ms']:.1f} ms, "
+              f"bargains(mean) {entry['find_bargains_mean_ms']:.1f} ms")
+        del articles, df, stats
+    return results
+
+
+# --- search ---
+def _search_queries(names, count, to_chosung):
+    """카탈로그에서 종류별 질의를 뽑습니다: 단지명 일치, 접두, 부분, 초성, 여러 단어."""
+    step = max(1, len(names) // count)
+    sample = names[::step][:count]
+    queries = {'exact': [], 'prefix': [], 'substring': [], 'chosung': [], 'multi_token': []}
+    for name in sample:
+        parts = name.split(' ')
+        short = parts[-1]
+        queries['exact'].append(short)
+        queries['prefix'].append(short[:2])
+        queries['substring'].append(short[1:3] if len(short) > 3 else short)
+        queries['chosung'].append(to_chosung(short)[:3])
+        queries['multi_token'].append(f"{parts[-2] if len(parts) > 1 else ''} {short[:2]}".strip())
+    return queries
+
+
+def bench_search(args, standin):
+    import naver_real_estate as nre
+
+    catalogs = [('complex_map.json', nre.load_complex_map())]
+    catalogs += [(f'synthetic_{size}', fixtures.complex_catalog(size)) for size in args.catalog_sizes]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, catalog in catalogs:
+            path = os.path.join(tmp, f'{label}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f, ensure_ascii=False)
+            index = nre.ComplexSearchIndex(path)
+            build_started = time.perf_counter()
+            index.ensure_loaded()
+            build_sec = time.perf_counter() - build_started
+
+            entry = {'catalog': label, 'complexes': len(catalog), 'index_build_ms': _ms(build_sec), 'queries': {}}
+            for kind, queries in _search_queries(list(catalog), args.queries, nre.to_chosung).items():
+                samples, hits = [], 0
+                for query in queries:
+                    started = time.perf_counter()
+                    found = index.search(query, limit=50)
+                    samples.append(time.perf_counter() - started)
+                    hits += bool(found)
+                entry['queries'][kind] = dict(latency_summary(samples), hit_rate=round(hits / len(queries), 3))
+            results.append(entry)
+            print(f"  search {label}: build {entry['index_build_ms']:.0f} ms, "
+                  f"prefix p95 {entry['queries']['prefix']['p95_ms']:.2f} ms")
+    return results
+
+
+# --- endpoints ---
+def _start_app_server(app, threads):
+    from waitress import create_server
+
+    sockets = {}
+    server = create_server(app, host='127.0.0.1', port=0, threads=threads, map=sockets)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    server.bench_sockets, server.bench_thread = sockets, thread
+    return server, f'http://127.0.0.1:{server.effective_port}'
+
+
+def _stop_app_server(server):
+    """
+    waitress 이벤트 루프 스레드 안에서 소켓을 모두 닫아 루프가 스스로 끝나게 합니다.
+    다른 스레드에서 server.close()를 부르면 루프가 닫힌 소켓을 polling 하며 EBADF 트레이스백을 남깁니다.
+    """
+    from waitress import wasyncore
+
+    server.trigger.pull_trigger(lambda: wasyncore.close_all(server.bench_sockets))
+    server.bench_thread.join(timeout=10)
+    server.task_dispatcher.shutdown()
+
+
+def _run_clients(base_url, paths, concurrency, headers=None):
+    import requests
+
+    local = threading.local()
+
+    def call(path):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.get(base_url + path, headers=headers, timeout=60)
+            response.content  # 스트리밍 응답도 본문을 끝까지 받습니다.
+            status = response.status_code
+        except requests.RequestException:
+            status = 'error'
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(call, paths))
+    elapsed = time.perf_counter() - started
+    statuses = {}
+    for _, status in outcomes:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return dict(latency_summary([latency for latency, _ in outcomes]),
+                requests_per_sec=round(len(outcomes) / elapsed, 1), statuses=statuses)
+
+
+def bench_endpoints(args, standin):
+    import app as app_module
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with app_module.app.app_context():
+        app_module.db.create_all()
+    app_module.sync_announcements()
+    server, base_url = _start_app_server(app_module.app, args.server_threads)
+
+    today = date.today()
+    month = f"start={today.replace(day=1).isoformat()}&end={(today.replace(day=1) + timedelta(days=40)).isoformat()}"
+    cold_counter = iter(range(2000, 10_000_000))
+    endpoints = [
+        ('calendar_events', lambda: f'/api/calendar_events?{month}', None),
+        ('search', lambda: '/api/apartments/search?keyword=래미안&limit=20', None),
+        ('analysis_cached', lambda: '/api/apartments/1000/analysis', None),
+        # 매 요청마다 다른 단지 → 캐시 미스, 대역 서버에서 매물 페이지를 받아옵니다.
+        ('analysis_uncached', lambda: f'/api/apartments/{next(cold_counter)}/analysis', None),
+        ('sales_compact_gzip', lambda: '/api/apartments/1000/sales?format=compact',
+         {'Accept-Encoding': 'gzip'}),
+    ]
+    _run_clients(base_url, ['/api/apartments/1000/analysis'], 1)  # 캐시 워밍
+
+    results = []
+    try:
+        for name, make_path, headers in endpoints:
+            for concurrency in args.concurrency:
+                paths = [make_path() for _ in range(args.requests_per_level)]
+                entry = dict(endpoint=name, concurrency=concurrency,
+                             **_run_clients(base_url, paths, concurrency, headers))
+                results.append(entry)
+                print(f"  endpoint {name:<20} c={concurrency:<3} {entry['requests_per_sec']:>8.1f} req/s, "
+                      f"p95 {entry['p95_ms']:.1f} ms")
+    finally:
+        _stop_app_server(server)
+    return results
+
+
+# --- fanout ---
+async def _fanout(standin, users, global_rate, per_chat_rate, concurrency):
+    import telegram
+    from telegram.request import HTTPXRequest
+    from telegram_fanout import TelegramFanout
+
+    request = HTTPXRequest(connection_pool_size=concurrency)
+    async with telegram.Bot(token='123456:bench', base_url=f'{standin.base_url}/bot', request=request) as bot:
+        fanout = TelegramFanout(bot, concurrency=concurrency, global_rate=global_rate, per_chat_rate=per_chat_rate)
+        messages = [(100_000 + i, f'벤치 알림 {i}', i) for i in range(users)]
+        delivered = await fanout.send(messages)
+    return dict(fanout.stats.as_dict(), delivered=len(delivered))
+
+
+def bench_fanout(args, standin):
+    import telegram_fanout
+
+    profiles = [
+        ('telegram_limits', telegram_fanout.GLOBAL_RATE, telegram_fanout.PER_CHAT_RATE),
+        # 한도를 풀어 발송 파이프라인 자체의 오버헤드만 측정
+        ('unthrottled', 1_000_000, 1_000_000),
+    ]
+    results = []
+    for profile, global_rate, per_chat_rate in profiles:
+        for users in args.fanout_users:
+            if profile == 'telegram_limits' and users > args.fanout_limited_max_users:
+                results.append({'profile': profile, 'users': users, 'skipped': True,
+                                'projected_elapsed_sec': round(users / global_rate, 1)})
+                continue
+            entry = dict(profile=profile, users=users,
+                         **asyncio.run(_fanout(standin, users, global_rate, per_chat_rate, args.fanout_concurrency)))
+            results.append(entry)
+            print(f"  fanout {profile:<16} {users:>6} users: {entry['elapsed_sec']:.2f} s ({entry['per_sec']} msg/s)")
+    return results
+
+
+SUITE_RUNNERS = {
+    'frames': bench_frames,
+    'search': bench_search,
+    'endpoints': bench_endpoints,
+    'fanout': bench_fanout,
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _sizes(value):
+    return [int(v.replace('_', '')) for v in value.split(',') if v]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Offline benchmarks against a local upstream stand-in.')
+    parser.add_argument('--suites', default=','.join(SUITES), help=f"comma separated: {','.join(SUITES)}")
+    parser.add_argument('--quick', action='store_true', help='smaller inputs for a fast smoke run')
+    parser.add_argument('--output', help='result JSON path (default bench/results/bench-<timestamp>.json)')
+    parser.add_argument('--repeat', type=int, default=3, help='repetitions for micro benchmarks (best is kept)')
+    parser.add_argument('--frame-sizes', type=_sizes, default=FRAME_SIZES)
+    parser.add_argument('--catalog-sizes', type=_sizes, default=CATALOG_SIZES)
+    parser.add_argument('--queries', type=int, default=200, help='queries per kind in the search suite')
+    parser.add_argument('--concurrency', type=_sizes, default=CONCURRENCY_LEVELS)
+    parser.add_argument('--requests-per-level', type=int, default=REQUESTS_PER_LEVEL)
+    parser.add_argument('--server-threads', type=int, default=4, help='waitress threads (its default is 4)')
+    parser.add_argument('--fanout-users', type=_sizes, default=FANOUT_USERS)
+    parser.add_argument('--fanout-limited-max-users', type=int, default=FANOUT_LIMITED_MAX_USERS)
+    parser.add_argument('--fanout-concurrency', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=20, help='injected upstream latency')
+    parser.add_argument('--jitter-ms', type=float, default=5)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of upstream calls that fail')
+    parser.add_argument('--articles-per-complex', type=int, default=200)
+    parser.add_argument('--announcements', type=int, default=300)
+    args = parser.parse_args(argv)
+    if args.quick:
+        for key, value in QUICK.items():
+            if parser.get_default(key) == getattr(args, key):
+                setattr(args, key, value)
+    args.suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    standin = StandIn(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                      articles_per_complex=args.articles_per_complex, announcements=args.announcements).start()
+
+    # app / naver_real_estate는 import 시점에 외부 API 주소를 읽으므로 import 전에 설정합니다.
+    workdir = tempfile.mkdtemp(prefix='home-alert-bench-')
+    os.environ.update(standin.env())
+    os.environ.update({
+        'WERKZEUG_RUN_MAIN': 'true',  # 스케줄러는 띄우지 않습니다.
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'CHUNGYAK_API_KEY': 'bench',
+    })
+
+    started_at = datetime.now()
+    report = {
+        'meta': {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {key: value for key, value in vars(args).items()},
+        },
+        'suites': {},
+    }
+    try:
+        for suite in args.suites:
+            print(f"[{suite}]")
+            suite_started = time.perf_counter()
+            report['suites'][suite] = SUITE_RUNNERS[suite](args, standin)
+            print(f"  ({time.perf_counter() - suite_started:.1f} s)")
+    finally:
+        standin.stop()
+
+    try:
+        import pandas
+        report['meta']['pandas'] = pandas.__version__
+    except ImportError:
+        pass
+    report['meta']['standin_requests'] = standin.requests
+    report['meta']['elapsed_sec'] = round((datetime.now() - started_at).total_seconds(), 1)
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"bench-{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+odcloud, 네이버 PC/모바일, 카카오, 텔레그램을 흉내 내는 로컬 대역(stand-in) 서버.
+
+    python -m bench.standin --port 8765 --latency-ms 50 --error-rate 0.05
+
+지연(latency ± jitter)과 오류(503, 텔레그램은 429 retry_after)를 주입할 수 있습니다.
+env() 의 환경 변수를 설정한 뒤 app을 띄우면 모든 외부 호출이 이 서버로 향합니다.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from bench import fixtures
+
+PC_ARTICLES = re.compile(r'^/api/articles/complex/(\d+)$')
+TELEGRAM = re.compile(r'^/bot[^/]+/(\w+)$')
+
+
+class StandIn:
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 articles_per_complex=200, announcements=300, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.articles_per_complex = articles_per_complex
+        self.announcements = announcements
+        self.requests = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._message_id = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def env(self):
+        """app/naver_real_estate가 이 서버를 바라보게 하는 환경 변수."""
+        return {
+            'ODCLOUD_BASE_URL': self.base_url,
+            'NAVER_PC_BASE_URL': self.base_url,
+            'NAVER_MOBILE_BASE_URL': self.base_url,
+            'KAKAO_AUTH_BASE_URL': self.base_url,
+            'KAKAO_API_BASE_URL': self.base_url,
+            'TELEGRAM_API_BASE_URL': f'{self.base_url}/bot',
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, route):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _delay_and_fail(self):
+        """지연을 주입하고, 오류를 주입해야 하면 True를 반환합니다."""
+        with self._lock:
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+    def _next_message_id(self):
+        with self._lock:
+            self._message_id += 1
+            return self._message_id
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _form(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length).decode('utf-8') if length else ''
+                if 'json' in (self.headers.get('Content-Type') or ''):
+                    return json.loads(raw or '{}')
+                return {k: v[0] for k, v in parse_qs(raw).items()}
+
+            def do_GET(self):
+                self._route('GET')
+
+            def do_POST(self):
+                self._route('POST')
+
+            def _route(self, method):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                body = self._form() if method == 'POST' else {}
+                telegram = TELEGRAM.match(url.path)
+                route = ('telegram' if telegram else
+                         'naver_pc' if PC_ARTICLES.match(url.path) else
+                         'naver_mobile' if url.path == '/complex/getComplexArticleList' else
+                         'odcloud' if url.path.startswith('/api/ApplyhomeInfoDetailSvc/') else
+                         'kakao' if url.path in ('/oauth/token', '/v2/user/me') else 'unknown')
+                standin._count(route)
+                if route == 'unknown':
+                    return self._send(404, {'error': 'unknown route'})
+
+                if standin._delay_and_fail():
+                    if route == 'telegram':
+                        return self._send(429, {'ok': False, 'error_code': 429,
+                                                'description': 'Too Many Requests: retry after 1',
+                                                'parameters': {'retry_after': 1}})
+                    return self._send(503, {'error': 'injected failure'})
+
+                if route == 'naver_pc':
+                    complex_no = PC_ARTICLES.match(url.path).group(1)
+                    page = int(query.get('page', 1))
+                    return self._send(200, fixtures.naver_pc_page(complex_no, page, standin.articles_per_complex))
+                if route == 'naver_mobile':
+                    page = int(query.get('page', 1))
+                    return self._send(200, fixtures.naver_mobile_page(
+                        query.get('hscpNo', '1000'), page, standin.articles_per_complex))
+                if route == 'odcloud':
+                    page, per_page = int(query.get('page', 1)), int(query.get('perPage', 100))
+                    return self._send(200, fixtures.odcloud_page(page, per_page, standin.announcements))
+                if route == 'kakao':
+                    return self._send(200, fixtures.kakao_token() if url.path == '/oauth/token' else fixtures.kakao_me())
+
+                bot_method = telegram.group(1)
+                if bot_method == 'getMe':
+                    return self._send(200, fixtures.telegram_me())
+                if bot_method == 'sendMessage':
+                    return self._send(200, fixtures.telegram_send(
+                        standin._next_message_id(), body.get('chat_id', 0), body.get('text', ''), time.time()))
+                return self._send(200, {'ok': True, 'result': True})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for odcloud/Naver/Kakao/Telegram.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--jitter-ms', type=float, default=5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--articles-per-complex', type=int, default=200)
+    parser.add_argument('--announcements', type=int, default=300)
+    args = parser.parse_args()
+
+    standin = StandIn(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                      args.articles_per_complex, args.announcements)
+    print(f"Stand-in listening on {standin.base_url}. Point the app at it with:")
+    for key, value in standin.env().items():
+        print(f"  export {key}={value}")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
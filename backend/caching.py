@@ -0,0 +1,311 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# --- 캐시 백엔드 ---
+# 엔트리는 {'value': ..., 'fetched_at': epoch초} 형태의 JSON 직렬화 가능한 dict 입니다.
+
+class MemoryBackend:
+    """프로세스 내부 dict 기반 백엔드 (기본값)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            return entry
+
+    def set(self, key, entry, ttl):
+        with self._lock:
+            self._data[key] = (entry, time.time() + ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self, prefix=''):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def acquire_lock(self, key, ttl):
+        # 프로세스 내부 중복 호출은 SnapshotCache가 직접 합치므로 항상 성공
+        return 'local'
+
+    def release_lock(self, key, token):
+        pass
+
+
+class RedisBackend:
+    """여러 gunicorn/waitress 워커가 하나의 스냅샷을 공유하기 위한 Redis 백엔드."""
+
+    def __init__(self, url, prefix='home_alert:'):
+        import redis  # 선택 의존성: REDIS_URL을 설정한 경우에만 필요
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, entry, ttl):
+        self._client.set(self._prefix + key, json.dumps(entry, ensure_ascii=False), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self._client.delete(self._prefix + key)
+
+    def clear(self, prefix=''):
+        for key in self._client.scan_iter(match=f"{self._prefix}{prefix}*"):
+            self._client.delete(key)
+
+    # 토큰이 일치할 때만 지워, 만료 후 다른 워커가 새로 잡은 락을 지우지 않도록 합니다.
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def acquire_lock(self, key, ttl):
+        """락을 잡으면 해제에 쓸 토큰을, 이미 잡혀 있으면 None을 반환합니다."""
+        token = uuid.uuid4().hex
+        if self._client.set(f"{self._prefix}lock:{key}", token, nx=True, ex=max(1, int(ttl))):
+            return token
+        return None
+
+    def release_lock(self, key, token):
+        self._client.eval(self.RELEASE_SCRIPT, 1, f"{self._prefix}lock:{key}", token)
+
+
+def make_backend(url=None):
+    """URL이 redis:// 로 시작하면 공유 백엔드를, 아니면 메모리 백엔드를 반환합니다."""
+    if url and url.startswith(('redis://', 'rediss://')):
+        try:
+            return RedisBackend(url)
+        except Exception as e:
+            logging.error(f"Redis cache backend unavailable, falling back to memory: {e}")
+    return MemoryBackend()
+
+
+# --- 스냅샷 캐시 ---
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SnapshotCache:
+    """
+    키(예: 지역)별 스냅샷을 TTL 동안 보관하는 캐시.
+    - TTL이 지난 뒤 stale_ttl 이내라면 기존 값을 바로 반환하고 백그라운드에서 갱신합니다.
+    - 같은 키에 대한 동시 미스는 한 번의 loader 호출로 합쳐집니다 (single-flight).
+    """
+
+    def __init__(self, loader, ttl=300, stale_ttl=3600, backend=None, name='snapshot', lock_timeout=15):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self.lock_timeout = lock_timeout
+        self._backend = backend or MemoryBackend()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return f"{self.name}:{'*' if key is None else key}"
+
+    def get(self, key=None):
+        entry = self._backend.get(self._key(key))
+        if entry is not None:
+            if time.time() - entry['fetched_at'] >= self.ttl:
+                self.stale_hits += 1
+                self.refresh_async(key)
+            else:
+                self.hits += 1
+            return entry['value']
+        self.misses += 1
+        return self._load(key)
+
+    def _load(self, key):
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return self._fly(key, flight)
+
+    def _fly(self, key, flight):
+        """리더로 등록된 flight의 값을 불러오고, 끝나면 등록을 지우고 기다리는 쪽을 깨웁니다."""
+        try:
+            flight.value = self._load_shared(key)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _load_shared(self, key):
+        cache_key = self._key(key)
+        token = self._backend.acquire_lock(cache_key, self.lock_timeout)
+        if token is None:
+            # 다른 워커가 이미 갱신 중이면 결과가 기록될 때까지 잠시 기다립니다.
+            deadline = time.time() + self.lock_timeout
+            while time.time() < deadline:
+                time.sleep(0.2)
+                entry = self._backend.get(cache_key)
+                if entry is not None and time.time() - entry['fetched_at'] < self.ttl:
+                    return entry['value']
+            # 기다려도 결과가 없으면 직접 불러오되, 다른 워커의 락은 건드리지 않습니다.
+        try:
+            value = self.loader(key)
+            self._backend.set(cache_key, {'value': value, 'fetched_at': time.time()}, self.ttl + self.stale_ttl)
+            return value
+        finally:
+            if token is not None:
+                self._backend.release_lock(cache_key, token)
+
+    def refresh_async(self, key=None):
+        """백그라운드 스레드에서 키를 갱신합니다. 이미 갱신 중이면 아무것도 하지 않습니다."""
+        # 스레드를 띄우기 전에 잠금 안에서 등록해야 동시에 들어온 stale 조회가 갱신을 한 번만 시작합니다.
+        with self._lock:
+            if key in self._inflight:
+                return
+            flight = self._inflight[key] = _Flight()
+
+        def _run():
+            try:
+                self._fly(key, flight)
+            except Exception as e:
+                logging.error(f"Background refresh of {self._key(key)} failed: {e}")
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def warm(self, keys):
+        """배포 직후 첫 요청이 느리지 않도록 주어진 키들을 미리 채웁니다."""
+        for key in keys:
+            try:
+                self._load(key)
+                logging.info(f"Warmed cache entry {self._key(key)}.")
+            except Exception as e:
+                logging.error(f"Failed to warm cache entry {self._key(key)}: {e}")
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._backend.clear(f"{self.name}:")
+        else:
+            self._backend.delete(self._key(key))
+
+    def stats(self):
+        return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses}
+
+
+# --- LRU 캐시 ---
+
+class LRUCache:
+    """
+    크기 제한(LRU)과 TTL이 있는 프로세스 내부 캐시.
+    get_or_load는 같은 키에 대한 동시 미스를 한 번의 loader 호출로 합칩니다.
+    """
+
+    def __init__(self, maxsize=128, ttl=300, name='lru'):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()  # key -> (value, fetched_at)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, fetched_at = item
+            if time.time() - fetched_at >= self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, should_cache=None):
+        """
+        캐시에 있으면 바로 반환하고, 없으면 loader()를 한 번만 호출해 채웁니다.
+        should_cache(value)가 False이면 결과를 반환만 하고 저장하지 않습니다.
+        """
+        value = self.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            if should_cache is None or should_cache(flight.value):
+                self.set(key, flight.value)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -1,6 +1,20 @@
+from sqlalchemy import inspect, text
+
 from app import app, db
 
 with app.app_context():
     print("Creating database tables...")
     db.create_all()
+    # create_all은 기존 테이블에 새로 추가된 nullable 컬럼과 인덱스를 만들지 않으므로 따로 추가합니다.
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                with db.engine.begin() as conn:
+                    conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                print(f"Added column {table.name}.{column.name}")
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
     print("Database tables created successfully.")
@@ -0,0 +1,326 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# --- 기본 설정 ---
+# (연결, 읽기) 타임아웃 초
+DEFAULT_TIMEOUT = (3, 10)
+DEFAULT_MAX_RETRIES = 2
+# 재시도 대기: backoff_base * 2^시도 (최대 backoff_max) 범위에서 무작위(full jitter)
+DEFAULT_BACKOFF_BASE = 0.3
+DEFAULT_BACKOFF_MAX = 5.0
+DEFAULT_POOL_SIZE = 16
+# 연속 실패가 이 횟수에 도달하면 reset 초 동안 요청을 보내지 않고 바로 실패시킵니다.
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_RESET_SECONDS = float(os.environ.get('CIRCUIT_RESET_SECONDS', 30))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# 재시도해도 안전한 메서드. POST(예: 카카오 토큰 교환)는 재시도하지 않습니다.
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class CircuitOpenError(requests.RequestException):
+    """업스트림이 장애로 판단되어 요청을 보내지 않고 바로 실패한 경우."""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 서킷 브레이커.
+    closed → (연속 실패 failure_threshold회) → open → (reset_timeout 경과) → half-open 시험 요청 1건
+    → 성공하면 closed, 실패하면 다시 open.
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probing:
+                return False
+            # half-open: 시험 요청 한 건만 통과시킵니다.
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logging.warning(f"Circuit opened after {self._failures} consecutive failures.")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def abandon(self):
+        """결과를 알 수 없이 끝난 요청(취소 등). 실패로 세지 않고 half-open 시험 자리만 돌려줍니다."""
+        with self._lock:
+            self._probing = False
+
+
+class Upstream:
+    """
+    업스트림 호스트 하나에 대한 클라이언트.
+    keep-alive 커넥션 풀을 공유하고, 429/5xx·연결 오류는 지수 백오프(jitter)로 재시도하며,
+    서킷이 열려 있으면 요청 없이 CircuitOpenError를 올립니다.
+    """
+
+    def __init__(self, name, base_url, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX,
+                 pool_size=DEFAULT_POOL_SIZE, headers=None, breaker=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        self.session.mount(self.base_url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        if headers:
+            self.session.headers.update(headers)
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+
+    def _url(self, path):
+        return path if path.startswith(('http://', 'https://')) else f"{self.base_url}/{path.lstrip('/')}"
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method, path, retries=None, **kwargs):
+        """
+        요청을 보내고 응답을 반환합니다. 상태 코드 검사는 호출한 쪽에서 raise_for_status()로 합니다.
+        retries를 생략하면 멱등 메서드만 max_retries까지 재시도합니다.
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+        kwargs.setdefault('timeout', self.timeout)
+        url = self._url(path)
+
+        for attempt in range(retries + 1):
+            if not self.breaker.allow():
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind='circuit_open')
+                raise CircuitOpenError(f"{self.name} circuit is open; not calling {url}")
+            self.requests += 1
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                kind = 'timeout' if isinstance(e, requests.Timeout) else 'connection'
+                metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream=self.name, outcome=kind)
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind=kind)
+                self.failures += 1
+                self.breaker.record_failure()
+                if attempt >= retries:
+                    raise
+                logging.warning(f"{self.name} request failed ({e}); retrying.")
+                response = None
+            except Exception:
+                # 본문 수신 중 끊김(ChunkedEncodingError), 리다이렉트 초과 등은 재시도하지 않지만 실패로 기록합니다.
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind='error')
+                self.failures += 1
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            else:
+                metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream=self.name,
+                                                         outcome=f"{response.status_code // 100}xx")
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind=f"http_{response.status_code}")
+                self.failures += 1
+                self.breaker.record_failure()
+                if attempt >= retries:
+                    return response
+                logging.warning(f"{self.name} returned {response.status_code}; retrying.")
+            self.retries += 1
+            time.sleep(self._backoff(attempt, response))
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def stats(self):
+        return {
+            'base_url': self.base_url,
+            'circuit': self.breaker.state,
+            'requests': self.requests,
+            'failures': self.failures,
+            'retries': self.retries,
+        }
+
+
+class AsyncUpstream:
+    """
+    Upstream의 asyncio(httpx) 버전. ASGI 경로에서 스레드 없이 업스트림 응답을 기다릴 때 사용합니다.
+    같은 이름의 동기 클라이언트와 타임아웃·헤더·서킷 브레이커·통계를 공유합니다.
+    """
+
+    def __init__(self, upstream, max_connections=100):
+        self.upstream = upstream
+        self.name = upstream.name
+        self.max_connections = max_connections
+        # httpx 커넥션 풀은 만든 이벤트 루프에서만 쓸 수 있으므로 루프별로 하나씩 둡니다.
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            import httpx  # 비동기 경로(asgi.py)를 쓸 때만 import 합니다.
+
+            connect, read = self.upstream.timeout
+            headers = {k: v for k, v in self.upstream.session.headers.items() if k.lower() != 'connection'}
+            client = self._clients[loop] = httpx.AsyncClient(
+                base_url=self.upstream.base_url,
+                headers=headers,
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return client
+
+    async def request(self, method, path, retries=None, **kwargs):
+        """Upstream.request와 같은 재시도/서킷 규칙으로 요청하고 httpx.Response를 반환합니다."""
+        import httpx
+
+        upstream = self.upstream
+        method = method.upper()
+        if retries is None:
+            retries = upstream.max_retries if method in IDEMPOTENT_METHODS else 0
+        url = upstream._url(path)
+        client = self._get_client()
+
+        for attempt in range(retries + 1):
+            if not upstream.breaker.allow():
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind='circuit_open')
+                raise CircuitOpenError(f"{self.name} circuit is open; not calling {url}")
+            upstream.requests += 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                kind = 'timeout' if isinstance(e, httpx.TimeoutException) else 'connection'
+                metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream=self.name, outcome=kind)
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind=kind)
+                upstream.failures += 1
+                upstream.breaker.record_failure()
+                if attempt >= retries:
+                    raise
+                logging.warning(f"{self.name} async request failed ({e!r}); retrying.")
+                response = None
+            except Exception:
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind='error')
+                upstream.failures += 1
+                upstream.breaker.record_failure()
+                raise
+            except BaseException:
+                # CancelledError: 미리 요청한 페이지가 필요 없어져 취소된 경우 등은 실패가 아닙니다.
+                upstream.breaker.abandon()
+                raise
+            else:
+                metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream=self.name,
+                                                         outcome=f"{response.status_code // 100}xx")
+                if response.status_code not in RETRY_STATUSES:
+                    upstream.breaker.record_success()
+                    return response
+                metrics.UPSTREAM_ERRORS.inc(upstream=self.name, kind=f"http_{response.status_code}")
+                upstream.failures += 1
+                upstream.breaker.record_failure()
+                if attempt >= retries:
+                    return response
+                logging.warning(f"{self.name} returned {response.status_code}; retrying.")
+            upstream.retries += 1
+            await asyncio.sleep(upstream._backoff(attempt, response))
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def aclose(self):
+        """현재 이벤트 루프의 커넥션 풀을 닫습니다."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+# --- 업스트림 레지스트리 ---
+_upstreams = {}
+_async_upstreams = {}
+_lock = threading.Lock()
+
+
+def register(name, base_url, **options):
+    """이름으로 업스트림을 등록합니다. 이미 등록된 이름이면 기존 클라이언트를 반환합니다."""
+    with _lock:
+        upstream = _upstreams.get(name)
+        if upstream is None:
+            upstream = _upstreams[name] = Upstream(name, base_url, **options)
+        return upstream
+
+
+def get(name):
+    return _upstreams[name]
+
+
+def get_async(name, max_connections=100):
+    """등록된 업스트림의 비동기 클라이언트를 반환합니다. httpx 클라이언트는 첫 요청 때 만들어집니다."""
+    with _lock:
+        client = _async_upstreams.get(name)
+        if client is None:
+            client = _async_upstreams[name] = AsyncUpstream(_upstreams[name], max_connections)
+        return client
+
+
+async def aclose_all():
+    """ASGI 종료 시 비동기 클라이언트의 커넥션을 닫습니다."""
+    with _lock:
+        clients = list(_async_upstreams.values())
+    for client in clients:
+        await client.aclose()
+
+
+def stats():
+    """업스트림별 서킷 상태와 요청/실패/재시도 횟수."""
+    with _lock:
+        upstreams = list(_upstreams.values())
+    return {upstream.name: upstream.stats() for upstream in upstreams}
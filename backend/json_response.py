@@ -0,0 +1,81 @@
+import json
+import math
+import zlib
+
+from flask import Response
+
+try:
+    import orjson  # 빠른 JSON 인코더 (없으면 표준 json으로 대체)
+except ImportError:
+    orjson = None
+
+# 스트리밍 시 한 번에 직렬화할 행 수
+CHUNK_ROWS = 500
+
+
+def dumps(obj):
+    """obj를 UTF-8 JSON bytes로 직렬화합니다. NaN은 null로 내보냅니다."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_replace_nan(obj), ensure_ascii=False, default=str).encode('utf-8')
+
+
+def _replace_nan(obj):
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    if isinstance(obj, dict):
+        return {k: _replace_nan(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_nan(v) for v in obj]
+    return obj
+
+
+class RecordStream:
+    """DataFrame을 CHUNK_ROWS 단위 records 배열로 나눠 직렬화하기 위한 래퍼."""
+
+    def __init__(self, df, chunk_rows=CHUNK_ROWS):
+        self.df = df
+        self.chunk_rows = chunk_rows
+
+    def __iter__(self):
+        yield b'['
+        for start in range(0, len(self.df), self.chunk_rows):
+            chunk = dumps(self.df.iloc[start:start + self.chunk_rows].to_dict(orient='records'))
+            # 청크별 배열의 대괄호를 벗겨 하나의 배열로 이어 붙입니다.
+            yield (b',' if start else b'') + chunk[1:-1]
+        yield b']'
+
+
+def columnar(df):
+    """records 대신 {컬럼: [값...]} 형태로 변환합니다. 키 반복이 없어 응답이 작습니다."""
+    return {col: df[col].tolist() for col in df.columns}
+
+
+def iter_json_object(items):
+    """(key, value) 목록을 JSON 객체로 조금씩 직렬화합니다. value가 RecordStream이면 청크 단위로 내보냅니다."""
+    yield b'{'
+    for i, (key, value) in enumerate(items):
+        yield (b',' if i else b'') + dumps(key) + b':'
+        if isinstance(value, RecordStream):
+            yield from value
+        else:
+            yield dumps(value)
+    yield b'}'
+
+
+def _gzip(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip 헤더
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_json(chunks, request):
+    """JSON bytes 청크를 스트리밍 응답으로 내보냅니다. 클라이언트가 지원하면 gzip으로 압축합니다."""
+    headers = {'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        chunks = _gzip(chunks)
+    return Response(chunks, mimetype='application/json', headers=headers)
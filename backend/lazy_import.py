@@ -0,0 +1,24 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    속성에 처음 접근할 때 실제 모듈을 import 하는 프록시.
+    pandas처럼 무거운 의존성을 쓰지 않는 워커(로그인/프로필 등만 처리)는 import 비용을 치르지 않습니다.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
@@ -0,0 +1,189 @@
+"""
+프로세스 내부 메트릭 레지스트리와 Prometheus 텍스트 포맷 출력.
+
+기록은 잠금 한 번과 dict 갱신뿐이라 운영 환경에서 항상 켜 둘 수 있습니다.
+워커(프로세스)마다 따로 집계되므로 여러 워커를 띄우면 각 워커를 따로 수집하거나 합산해서 봐야 합니다.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+NAMESPACE = 'home_alert'
+# 요청/외부 API 지연(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# DB 쿼리 지연(초)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+# 예약 작업 소요 시간(초)
+JOB_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.name = f"{NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # callback()이 {라벨 값 튜플: 값}을 돌려주면 수집 시점에 그 값을 그대로 내보냅니다.
+        # (캐시 통계처럼 다른 객체가 이미 세고 있는 값을 노출할 때 사용)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def _items(self):
+        if self.callback is not None:
+            return list(self.callback().items())
+        with self._lock:
+            return list(self._values.items())
+
+    def render(self):
+        return self._header() + [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+                                 for key, value in self._items()]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [버킷별 개수(마지막은 +Inf), 합계, 개수]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        lines = self._header()
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render():
+    """등록된 모든 메트릭을 Prometheus 텍스트 포맷(0.0.4)으로 반환합니다."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# --- 공용 메트릭 ---
+HTTP_REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'API request latency by route.',
+                                 ['method', 'route', 'status'])
+UPSTREAM_REQUEST_SECONDS = Histogram('upstream_request_duration_seconds', 'Outbound call latency by upstream.',
+                                     ['upstream', 'outcome'])
+UPSTREAM_ERRORS = Counter('upstream_errors_total', 'Outbound call errors by upstream and kind.',
+                          ['upstream', 'kind'])
+DB_QUERY_SECONDS = Histogram('db_query_duration_seconds', 'Database statement latency by statement type.',
+                             ['statement'], buckets=DB_BUCKETS)
+NAVER_FALLBACKS = Counter('naver_mobile_fallback_total', 'Naver fetches that fell back to the mobile API.',
+                          ['reason'])
+JOB_SECONDS = Histogram('job_duration_seconds', 'Scheduled job duration.', ['job', 'status'], buckets=JOB_BUCKETS)
+TELEGRAM_MESSAGES = Counter('telegram_messages_total', 'Telegram notification sends by outcome.', ['outcome'])
+
+
+# --- SQLAlchemy 계측 ---
+_STATEMENTS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE'}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['metrics_started'].pop()
+    verb = statement.lstrip()[:6].upper()
+    DB_QUERY_SECONDS.observe(time.perf_counter() - started, statement=verb if verb in _STATEMENTS else 'OTHER')
+
+
+def _handle_error(exception_context):
+    # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 시작 시각만 정리합니다.
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('metrics_started'):
+        conn.info['metrics_started'].pop()
+
+
+def instrument_sqlalchemy():
+    """모든 SQLAlchemy 엔진의 쿼리 실행 시간을 DB_QUERY_SECONDS에 기록합니다."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
@@ -1,8 +1,25 @@
+import asyncio
 import requests
-import pandas as pd
 import re
 import json
 import os
+import bisect
+import hashlib
+import itertools
+import threading
+import math
+import weakref
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import metrics
+from lazy_import import LazyModule
+
+# pandas/numpy are imported on first use so that workers that only search complexes
+# (or never touch this module's analysis functions) skip their import time and memory.
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
 
 # --- Constants and Configuration ---
 # NOTE: These headers are minimal and do not require session-specific tokens,
@@ -21,46 +38,267 @@ MOBILE_HEADERS = {
 
 # --- Data Loading ---
 
-def load_complex_map():
+COMPLEX_MAP_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'complex_map.json')
+
+def load_complex_map(path=COMPLEX_MAP_PATH):
     """Loads the apartment complex mapping from the JSON file."""
     try:
-        dir_path = os.path.dirname(os.path.realpath(__file__))
-        file_path = os.path.join(dir_path, 'complex_map.json')
-        with open(file_path, "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except FileNotFoundError:
         return {}
 
-def search_complexes(keyword):
-    """Searches for apartment complexes by a keyword."""
-    complex_map = load_complex_map()
-    if not keyword:
-        return complex_map
-    return {k: v for k, v in complex_map.items() if keyword in k}
+# --- Complex Search Index ---
+
+CHOSUNG = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ',
+           'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+CHOSUNG_SET = set(CHOSUNG)
+
+def to_chosung(text):
+    """Replaces every Hangul syllable with its initial consonant ('개포자이' -> 'ㄱㅍㅈㅇ')."""
+    return ''.join(CHOSUNG[(ord(ch) - 0xAC00) // 588] if '가' <= ch <= '힣' else ch for ch in text)
+
+def is_chosung_query(keyword):
+    return any(ch in CHOSUNG_SET for ch in keyword) and all(ch in CHOSUNG_SET or ch.isspace() for ch in keyword)
+
+class _SearchView:
+    """Bigram inverted index plus a sorted list of complex names for one text form (plain or 초성)."""
+
+    def __init__(self, full_texts, short_texts):
+        self.full = full_texts
+        self.short = short_texts
+        # (complex name, index) sorted so prefix matches are a bisect away.
+        self.sorted_short = sorted((name, i) for i, name in enumerate(short_texts))
+        self.grams = {}
+        for i, text in enumerate(full_texts):
+            for gram in {text[j:j + 2] for j in range(len(text) - 1)} | set(text):
+                postings = self.grams.get(gram)
+                if postings is None:
+                    postings = self.grams[gram] = array('i')
+                postings.append(i)
+
+    def prefix_matches(self, token):
+        start = bisect.bisect_left(self.sorted_short, (token,))
+        for name, i in itertools.islice(self.sorted_short, start, None):
+            if not name.startswith(token):
+                break
+            yield i
+
+    def candidates(self, tokens):
+        """Smallest posting list across all tokens' bigrams (or characters for 1-char tokens)."""
+        best = None
+        for token in tokens:
+            grams = [token[j:j + 2] for j in range(len(token) - 1)] or [token]
+            for gram in grams:
+                postings = self.grams.get(gram)
+                if postings is None:
+                    return []
+                if best is None or len(postings) < len(best):
+                    best = postings
+        return best if best is not None else []
+
+class ComplexSearchIndex:
+    """
+    In-memory search index over complex_map.json, reloaded when the file's mtime changes.
+    Results are ranked: exact complex name, complex name prefix, then substring matches.
+    Queries made only of initial consonants (e.g. 'ㄱㅍㅈㅇ') are matched against 초성 forms.
+    """
+
+    def __init__(self, path=COMPLEX_MAP_PATH):
+        self.path = path
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._names, self._ids, self._plain, self._chosung = [], [], None, None
+
+    def ensure_loaded(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime and self._plain is not None:
+            return
+        with self._lock:
+            if mtime == self._mtime and self._plain is not None:
+                return
+            complex_map = load_complex_map(self.path)
+            names = list(complex_map.keys())
+            short = [name.rsplit(' ', 1)[-1] for name in names]
+            plain = _SearchView(names, short)
+            chosung = _SearchView([to_chosung(n) for n in names], [to_chosung(n) for n in short])
+            self._names, self._ids = names, [complex_map[n] for n in names]
+            self._plain, self._chosung = plain, chosung
+            self._mtime = mtime
+
+    def search(self, keyword, limit=None):
+        """Returns an ordered {name: complex_id} dict of matches, best first."""
+        self.ensure_loaded()
+        names, ids = self._names, self._ids
+        tokens = keyword.split()
+        if not tokens:
+            selected = range(len(names)) if limit is None else range(min(limit, len(names)))
+            return {names[i]: ids[i] for i in selected}
+
+        view = self._chosung if is_chosung_query(keyword) else self._plain
+        whole = ' '.join(tokens)
+        ranked = {}
+        if len(tokens) == 1:
+            for i in view.prefix_matches(whole):
+                ranked[i] = (0 if view.short[i] == whole else 1, len(view.short[i]), names[i])
+        if limit is None or len(ranked) < limit:
+            for i in view.candidates(tokens):
+                if i in ranked:
+                    continue
+                text = view.full[i]
+                if all(token in text for token in tokens):
+                    ranked[i] = (2, text.find(tokens[0]), len(text), names[i])
+
+        order = sorted(ranked, key=ranked.get)
+        if limit is not None:
+            order = order[:limit]
+        return {names[i]: ids[i] for i in order}
+
+complex_index = ComplexSearchIndex()
+
+def search_complexes(keyword, limit=None):
+    """Searches for apartment complexes by a keyword (plain text or 초성), best matches first."""
+    return complex_index.search(keyword or '', limit)
 
 # --- Data Fetching with Fallback ---
 
-def pc_fetch_articles(session, complex_no, trade_type, page=1):
-    """Fetches a single page of articles from the PC API."""
-    session.headers.update(PC_HEADERS)
-    session.headers.update({"referer": f"https://new.land.naver.com/complexes/{complex_no}"})
-    url = (f"https://new.land.naver.com/api/articles/complex/{complex_no}"
-           f"?realEstateType=APT%3AABYG%3AJGC%3APRE&tradeType={trade_type}"
-           f"&priceMin=0&priceMax=900000000&areaMin=0&areaMax=900000000"
-           f"&priceType=RETAIL&page={page}&type=list&order=prc&sameAddressGroup=true")
-    r = session.get(url, timeout=(3, 10))
+# Overridable so benchmarks can point the fetchers at a local stand-in server (see bench/).
+PC_BASE_URL = os.environ.get("NAVER_PC_BASE_URL", "https://new.land.naver.com")
+MOBILE_BASE_URL = os.environ.get("NAVER_MOBILE_BASE_URL", "https://m.land.naver.com")
+# Both APIs return 20 articles per page, which is what lets the mobile fallback resume mid-way.
+PAGE_SIZE = 20
+FETCH_WORKERS = int(os.environ.get('NAVER_FETCH_WORKERS', 8))
+# Pages requested past the last page known to have more data when the API reports no total.
+# The window grows with every full page read, up to FETCH_WORKERS (see _PagePlan).
+FETCH_AHEAD = int(os.environ.get('NAVER_FETCH_AHEAD', 2))
+
+_fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='naver-fetch')
+
+# Shared keep-alive clients with retries and circuit breaking (see http_client).
+# The PC API retries only once: when it is struggling, the mobile fallback is the faster way out,
+# and an open PC circuit sends every fetch straight to mobile.
+class FetchError(requests.RequestException):
+    """Raised when some pages of a complex could not be read from either API.
+    `articles` holds what was read, which is not a complete listing and must not be diffed or cached."""
+
+    def __init__(self, complex_no, page, articles):
+        super().__init__(f"Could not fetch complex {complex_no} from page {page} on either API")
+        self.complex_no = complex_no
+        self.page = page
+        self.articles = articles
+
+pc_client = http_client.register('naver_pc', PC_BASE_URL, headers=PC_HEADERS,
+                                 max_retries=1, pool_size=FETCH_WORKERS * 2)
+mobile_client = http_client.register('naver_mobile', MOBILE_BASE_URL, headers=MOBILE_HEADERS,
+                                     pool_size=FETCH_WORKERS * 2)
+
+# Request building and page parsing are shared by the sync fetchers and their async twins below.
+def _pc_request(complex_no, trade_type, page):
+    path = (f"/api/articles/complex/{complex_no}"
+            f"?realEstateType=APT%3AABYG%3AJGC%3APRE&tradeType={trade_type}"
+            f"&priceMin=0&priceMax=900000000&areaMin=0&areaMax=900000000"
+            f"&priceType=RETAIL&page={page}&type=list&order=prc&sameAddressGroup=true")
+    return path, {"referer": f"{PC_BASE_URL}/complexes/{complex_no}"}
+
+def _parse_pc_page(data):
+    articles = data.get("articleList", []) or []
+    return articles, bool(data.get("isMoreData", False)) and bool(articles), None
+
+MOBILE_ARTICLES_PATH = "/complex/getComplexArticleList"
+
+def _mobile_params(complex_no, trade_type, page):
+    return {"hscpNo": complex_no, "tradTpCd": trade_type, "order": "prc", "page": page}
+
+def _parse_mobile_page(data):
+    res = data.get("result", {}) or {}
+    articles = [normalize_mobile_article(art) for art in (res.get("list", []) or [])]
+    total = res.get("totAtclCnt")
+    is_more = res.get("moreDataYn") == "Y" if "moreDataYn" in res else len(articles) >= PAGE_SIZE
+    return articles, is_more and bool(articles), total
+
+def pc_fetch_articles(complex_no, trade_type, page=1):
+    """Fetches a single page of articles from the PC API. Returns (articles, is_more, total)."""
+    path, headers = _pc_request(complex_no, trade_type, page)
+    r = pc_client.get(path, headers=headers)
     r.raise_for_status()
-    return r.json().get("articleList", [])
-
-def mobile_fetch_articles(session, complex_no, trade_type, page=1):
-    """Fetches a single page of articles from the Mobile API."""
-    session.headers.update(MOBILE_HEADERS)
-    r = session.get("https://m.land.naver.com/complex/getComplexArticleList",
-                    params={"hscpNo": complex_no, "tradTpCd": trade_type, "order": "prc", "page": page},
-                    timeout=(3, 10))
+    return _parse_pc_page(r.json())
+
+def mobile_fetch_articles(complex_no, trade_type, page=1):
+    """Fetches a single page of articles from the Mobile API. Returns (articles, is_more, total)."""
+    r = mobile_client.get(MOBILE_ARTICLES_PATH, params=_mobile_params(complex_no, trade_type, page))
     r.raise_for_status()
-    res = r.json().get("result", {})
-    return res.get("list", []) or []
+    return _parse_mobile_page(r.json())
+
+class _PagePlan:
+    """
+    Decides which pages may be in flight. Pages are consumed in order from `page`.
+    Without a reported total (the PC API), the window starts at FETCH_AHEAD pages past the last page
+    known to have more data and grows to the number of full pages read so far, up to FETCH_WORKERS.
+    Speculative requests therefore never outnumber the pages actually read: a complex with N pages
+    costs at most N + min(N, FETCH_WORKERS) - 1 requests, while large complexes still get the full window.
+    Once a total is known (the mobile API), up to FETCH_WORKERS pages are fetched, never past the last page.
+    A short page stops speculation: later pages are only requested one at a time.
+    """
+
+    def __init__(self, start_page):
+        self.page = start_page
+        self.next_page = start_page
+        self.last_page = None
+        self.ahead = FETCH_AHEAD
+        self.pages_read = 0
+
+    def schedule(self):
+        """Returns the pages to request now."""
+        if self.last_page is not None:
+            limit = min(self.last_page, self.page - 1 + FETCH_WORKERS)
+        else:
+            limit = self.page - 1 + self.ahead
+        limit = max(limit, self.page)
+        pages = list(range(self.next_page, limit + 1))
+        self.next_page = max(self.next_page, limit + 1)
+        return pages
+
+    def advance(self, items, is_more, total):
+        """Records the current page's result. Returns False when there is nothing more to read."""
+        if not is_more:
+            return False
+        if total:
+            self.last_page = math.ceil(total / PAGE_SIZE)
+        self.pages_read += 1
+        if len(items) < PAGE_SIZE:
+            self.ahead = 1
+        elif self.ahead > 1:
+            self.ahead = min(FETCH_WORKERS, max(self.ahead, self.pages_read))
+        self.page += 1
+        return True
+
+def _fetch_pages(fetch_page, start_page=1):
+    """
+    Fetches pages from start_page until the API reports there is no more data.
+    Pages are prefetched concurrently as far as _PagePlan allows and consumed in order.
+    Returns (articles, failed_page); failed_page is None when every page succeeded.
+    """
+    articles = []
+    plan = _PagePlan(start_page)
+    pending = {}
+    try:
+        while True:
+            for p in plan.schedule():
+                pending[p] = _fetch_executor.submit(fetch_page, p)
+            page = plan.page
+            try:
+                items, is_more, total = pending.pop(page).result()
+            except (requests.RequestException, ValueError):
+                return articles, page
+            articles.extend(items)
+            if not plan.advance(items, is_more, total):
+                return articles, None
+    finally:
+        for f in pending.values():
+            f.cancel()
 
 def normalize_mobile_article(article):
     """Converts a mobile API article to the PC API format."""
@@ -81,46 +319,99 @@ def normalize_mobile_article(article):
         "sameAddrMinPrc": article.get("sameAddrMinPrc"),
         "realtorName": article.get("rltrNm"),
         "PBLANC_NO": article.get("atclNo"), # Use article number as a unique key
+        "articleNo": article.get("atclNo"),
     }
 
 def fetch_articles_with_fallback(complex_no, trade_type):
     """
     Fetches all articles for a complex, trying the PC API first and falling back to the Mobile API.
+    If the PC API fails part-way, the mobile fetch resumes from the failing page.
+    Raises FetchError when the mobile API fails too, so failures are never mistaken for empty listings.
     """
-    s = requests.Session()
-    all_articles = []
-    page = 1
-    
-    # Try PC API first
-    try:
-        while True:
-            articles = pc_fetch_articles(s, complex_no, trade_type, page)
-            if not articles:
-                break
-            all_articles.extend(articles)
-            page += 1
-        if all_articles:
-            return all_articles
-    except requests.RequestException:
-        # If PC API fails, reset and try mobile
-        pass
-
-    # Fallback to Mobile API
-    s = requests.Session() # Reset session for new headers
-    all_articles = []
-    page = 1
+    all_articles, failed_page = _fetch_pages(lambda page: pc_fetch_articles(complex_no, trade_type, page))
+    if failed_page is None and all_articles:
+        return all_articles
+    if failed_page is None:
+        # PC API answered with nothing at all; try the mobile API from the start.
+        failed_page = 1
+        metrics.NAVER_FALLBACKS.inc(reason='pc_empty')
+    else:
+        metrics.NAVER_FALLBACKS.inc(reason='pc_failed' if failed_page == 1 else 'pc_failed_midway')
+
+    mobile_articles, mobile_failed_page = _fetch_pages(
+        lambda page: mobile_fetch_articles(complex_no, trade_type, page), start_page=failed_page)
+    if mobile_failed_page is not None:
+        raise FetchError(complex_no, mobile_failed_page, all_articles + mobile_articles)
+    return all_articles + mobile_articles
+
+# --- Async fetching (ASGI path) ---
+# Same paging and fallback rules as above, but pages are awaited on the event loop instead of
+# occupying a thread each. A per-process semaphore caps in-flight Naver requests.
+ASYNC_FETCH_CONCURRENCY = int(os.environ.get('NAVER_ASYNC_CONCURRENCY', 64))
+_async_limits = weakref.WeakKeyDictionary()
+
+def _async_limit():
+    # Semaphores are bound to the running loop, so keep one per loop.
+    loop = asyncio.get_running_loop()
+    limit = _async_limits.get(loop)
+    if limit is None:
+        limit = _async_limits[loop] = asyncio.Semaphore(ASYNC_FETCH_CONCURRENCY)
+    return limit
+
+async def async_pc_fetch_articles(complex_no, trade_type, page=1):
+    path, headers = _pc_request(complex_no, trade_type, page)
+    async with _async_limit():
+        r = await http_client.get_async('naver_pc').get(path, headers=headers)
+    r.raise_for_status()
+    return _parse_pc_page(r.json())
+
+async def async_mobile_fetch_articles(complex_no, trade_type, page=1):
+    async with _async_limit():
+        r = await http_client.get_async('naver_mobile').get(
+            MOBILE_ARTICLES_PATH, params=_mobile_params(complex_no, trade_type, page))
+    r.raise_for_status()
+    return _parse_mobile_page(r.json())
+
+async def _async_fetch_pages(fetch_page, start_page=1):
+    """Async _fetch_pages with the same _PagePlan. Returns (articles, failed_page)."""
+    import httpx
+
+    articles = []
+    plan = _PagePlan(start_page)
+    pending = {}
     try:
         while True:
-            articles = mobile_fetch_articles(s, complex_no, trade_type, page)
-            if not articles:
-                break
-            normalized_articles = [normalize_mobile_article(art) for art in articles]
-            all_articles.extend(normalized_articles)
-            page += 1
-    except requests.RequestException:
-        return [] # Both failed
-        
-    return all_articles
+            for p in plan.schedule():
+                pending[p] = asyncio.ensure_future(fetch_page(p))
+            page = plan.page
+            try:
+                items, is_more, total = await pending.pop(page)
+            except (httpx.HTTPError, requests.RequestException, ValueError):
+                return articles, page
+            articles.extend(items)
+            if not plan.advance(items, is_more, total):
+                return articles, None
+    finally:
+        for task in pending.values():
+            task.cancel()
+
+async def async_fetch_articles_with_fallback(complex_no, trade_type):
+    """Async fetch_articles_with_fallback."""
+    all_articles, failed_page = await _async_fetch_pages(
+        lambda page: async_pc_fetch_articles(complex_no, trade_type, page))
+    if failed_page is None and all_articles:
+        return all_articles
+    if failed_page is None:
+        failed_page = 1
+        metrics.NAVER_FALLBACKS.inc(reason='pc_empty')
+    else:
+        metrics.NAVER_FALLBACKS.inc(reason='pc_failed' if failed_page == 1 else 'pc_failed_midway')
+
+    mobile_articles, mobile_failed_page = await _async_fetch_pages(
+        lambda page: async_mobile_fetch_articles(complex_no, trade_type, page), start_page=failed_page)
+    if mobile_failed_page is not None:
+        raise FetchError(complex_no, mobile_failed_page, all_articles + mobile_articles)
+    return all_articles + mobile_articles
 
 # --- Data Processing and Analysis (remains the same) ---
 
@@ -137,54 +428,157 @@ def parse_price(price_str):
     except (ValueError, IndexError):
         return None
 
+# Columns kept from the raw articles: what the analysis, dedup and the frontend table/modal read.
+SALES_COLUMNS = [
+    "articleNo", "articleName", "buildingName", "floorInfo", "dealOrWarrantPrc", "areaName",
+    "direction", "tradeTypeName", "articleConfirmYmd", "articleFeatureDesc", "tagList", "realtorName",
+]
+CATEGORY_COLUMNS = ["buildingName", "direction", "tradeTypeName", "realtorName"]
+
+def _parse_unique(values, parse):
+    """Runs a vectorized parser over the distinct values only and broadcasts the result back."""
+    codes, uniques = pd.factorize(values)
+    parsed = parse(pd.Series(uniques, dtype=object)).to_numpy(dtype="float64", na_value=np.nan)
+    return pd.Series(np.where(codes >= 0, parsed[codes], np.nan), index=values.index)
+
+def _parse_price_strings(prices):
+    prices = prices.astype(str).str.replace(",", "", regex=False)
+    parts = prices.str.extract(r"^\s*(\d+)\s*억\s*(\d*)")
+    billions = pd.to_numeric(parts[0], errors="coerce")
+    ten_thousands = pd.to_numeric(parts[1], errors="coerce").fillna(0)
+    digits_only = pd.to_numeric(prices.str.replace(r"[^\d]", "", regex=True), errors="coerce")
+    return (billions * 10000 + ten_thousands).where(billions.notna(), digits_only)
+
+def _parse_area_strings(areas):
+    return pd.to_numeric(areas.astype(str).str.extract(r"(\d+\.?\d*)", expand=False), errors="coerce")
+
+def parse_prices(prices):
+    """Vectorized parse_price: a Series of price strings -> float Series in 10,000s (NaN if unparseable)."""
+    return _parse_unique(prices, _parse_price_strings)
+
 def get_sales_dataframe(articles):
-    """Converts a list of articles into a processed Pandas DataFrame."""
+    """Converts a list of articles into a processed, compact Pandas DataFrame."""
     if not articles:
         return pd.DataFrame()
     
-    df = pd.DataFrame(articles)
+    df = pd.DataFrame.from_records(articles, columns=SALES_COLUMNS)
     dedup_cols = ["buildingName", "floorInfo", "areaName", "dealOrWarrantPrc", "direction"]
     df = df.drop_duplicates(subset=dedup_cols, keep="first")
-    df["price_num"] = df["dealOrWarrantPrc"].apply(parse_price)
-    df = df.dropna(subset=['price_num'])
-    
-    # Create a new column for grouping by integer area
-    df['areaGroup'] = df['areaName'].str.extract(r'(\d+\.?\d*)').astype(float).astype(int).astype(str) + '㎡'
-    return df
 
-def _sort_by_area_size(df, area_col='areaGroup'):
-    """Helper function to sort dataframes by the numerical part of the area name."""
-    df['sort_key'] = df[area_col].str.extract(r'(\d+)').astype(int)
-    return df.sort_values(by='sort_key').drop(columns=['sort_key'])
+    df = df.assign(
+        price_num=parse_prices(df["dealOrWarrantPrc"]),
+        area=_parse_unique(df["areaName"], _parse_area_strings),
+    )
+    df = df.dropna(subset=["price_num", "area"])
+    df["price_num"] = df["price_num"].astype("int64")
+
+    # Integer area (㎡) is the grouping key; areaGroup is its display label.
+    df["area_key"] = df["area"].astype("int64")
+    df["areaGroup"] = pd.Categorical.from_codes(*_area_labels(df["area_key"]))
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df.reset_index(drop=True)
+
+def _area_labels(area_keys):
+    """Returns (codes, categories) for '84㎡'-style labels, built once per distinct area."""
+    codes, uniques = pd.factorize(area_keys, sort=True)
+    return codes, [f"{key}㎡" for key in uniques]
+
+AREA_STATS_COLUMNS = {"25%": "q1", "50%": "median", "75%": "q3"}
 
-def analyze_area_stats(df):
+def compute_area_stats(df):
+    """
+    Single aggregation pass over the numeric area key.
+    Returns a DataFrame indexed by area_key (ascending) with areaGroup, count, mean, median,
+    q1, q3, min and max of price_num.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["areaGroup", "count", "mean", "median", "q1", "q3", "min", "max"])
+    stats = df.groupby("area_key", sort=True)["price_num"].describe().rename(columns=AREA_STATS_COLUMNS)
+    stats = stats.drop(columns=["std"])
+    stats["count"] = stats["count"].astype("int64")
+    stats.insert(0, "areaGroup", [f"{key}㎡" for key in stats.index])
+    return stats
+
+def analyze_area_stats(df, stats=None):
     """Calculates average price and count per area, grouped by integer area."""
     if df.empty:
         return [], []
-        
-    mean_prices = df.groupby("areaGroup")["price_num"].mean().reset_index()
-    mean_prices_sorted = _sort_by_area_size(mean_prices)
-    
-    count_by_area = df["areaGroup"].value_counts().reset_index()
-    count_by_area.columns = ["areaGroup", "count"]
-    count_by_area_sorted = _sort_by_area_size(count_by_area)
-    
-    # Rename column back to areaName for frontend compatibility
-    mean_prices_sorted = mean_prices_sorted.rename(columns={"areaGroup": "areaName"})
-    count_by_area_sorted = count_by_area_sorted.rename(columns={"areaGroup": "areaName"})
-    
-    return mean_prices_sorted.to_dict('records'), count_by_area_sorted.to_dict('records')
+    if stats is None:
+        stats = compute_area_stats(df)
+
+    # areaName keys are kept for frontend compatibility
+    mean_prices = [{"areaName": group, "price_num": mean} for group, mean in zip(stats["areaGroup"], stats["mean"])]
+    count_by_area = [{"areaName": group, "count": int(count)} for group, count in zip(stats["areaGroup"], stats["count"])]
+    return mean_prices, count_by_area
 
-def find_bargains(df, threshold=0.95):
-    """Finds bargain sales based on a discount threshold from the area's average price."""
+def find_bargains(df, threshold=0.95, method="mean", stats=None, iqr_k=1.5):
+    """
+    Finds bargain sales priced below threshold x the area's baseline price.
+    method="mean" uses the area's average price as the baseline; method="median" uses the
+    median, so a single very cheap listing does not drag the baseline down, and flags listings
+    below Q1 - iqr_k * IQR as is_outlier (often mislabeled listings rather than real bargains).
+    The input DataFrame is not modified, so it is safe to call on shared cached frames.
+    """
     if df.empty or 'price_num' not in df.columns:
         return pd.DataFrame()
+    if method not in ("mean", "median"):
+        raise ValueError(f"Unknown bargain method: {method}")
+    if stats is None:
+        stats = compute_area_stats(df)
 
-    # Group by the integer area for average price calculation
-    df["avg_price_by_area"] = df.groupby("areaGroup")["price_num"].transform("mean")
-    bargains = df[df["price_num"] < df["avg_price_by_area"] * threshold].copy()
-    
-    if not bargains.empty:
-        bargains["discount_pct"] = (1 - bargains["price_num"] / bargains["avg_price_by_area"]) * 100
-    
+    avg_price = df["area_key"].map(stats["mean"])
+    baseline = avg_price if method == "mean" else df["area_key"].map(stats["median"])
+    mask = df["price_num"] < baseline * threshold
+    bargains = df.loc[mask].assign(
+        avg_price_by_area=avg_price[mask],
+        baseline_price=baseline[mask],
+        discount_pct=(1 - df.loc[mask, "price_num"] / baseline[mask]) * 100,
+    )
+    if method == "median":
+        q1 = df.loc[mask, "area_key"].map(stats["q1"])
+        q3 = df.loc[mask, "area_key"].map(stats["q3"])
+        bargains["is_outlier"] = bargains["price_num"] < q1 - iqr_k * (q3 - q1)
     return bargains
+
+def rank_bargains(frames, limit=100):
+    """Merges bargain frames from several complexes and returns the top `limit` by discount_pct."""
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).nlargest(limit, "discount_pct")
+
+# Fields whose change counts as a listing change (confirmation dates alone do not).
+LISTING_HASH_COLUMNS = ["dealOrWarrantPrc", "buildingName", "floorInfo", "areaName", "direction"]
+
+def frame_version(df):
+    """
+    Returns a short content hash of a sales DataFrame, used as its ETag version.
+    The hash is computed once and kept in df.attrs, so cached frames pay for it only on first use.
+    """
+    version = df.attrs.get("version")
+    if version is None:
+        if df.empty:
+            version = "empty"
+        else:
+            hashes = pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+            version = hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+        df.attrs["version"] = version
+    return version
+
+def listing_hashes(df):
+    """
+    Returns a DataFrame indexed by articleNo with a signed 64-bit content hash and price per listing.
+    Hashing is vectorized, so comparing a fetch against stored hashes touches no Python per row.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["content_hash", "price_num", "summary"])
+    df = df.dropna(subset=["articleNo"]).drop_duplicates(subset=["articleNo"])
+    values = df[LISTING_HASH_COLUMNS].astype(str)
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy().view("int64")
+    summary = (df["areaGroup"].astype(str) + " " + df["buildingName"].astype(str) + " "
+               + df["floorInfo"].astype(str) + " " + df["dealOrWarrantPrc"].astype(str))
+    return pd.DataFrame({
+        "content_hash": hashes,
+        "price_num": df["price_num"].to_numpy(),
+        "summary": summary.to_numpy(),
+    }, index=df["articleNo"].astype(str).to_numpy())
@@ -0,0 +1,68 @@
+"""
+워커 부팅(import app) 시간 리포트.
+
+    python startup_report.py            # 상위 모듈별 import 시간 출력
+    STARTUP_BUDGET_MS=800 python startup_report.py
+
+`python -X importtime`으로 새 인터프리터에서 app을 import 하고, 전체 시간이 예산을
+넘거나 무거운 의존성(LAZY_MODULES)이 부팅 시점에 import 되면 종료 코드 1을 반환합니다.
+배포 전 점검이나 CI에서 부팅 시간 회귀를 잡는 용도입니다.
+"""
+import os
+import subprocess
+import sys
+
+STARTUP_BUDGET_MS = int(os.environ.get('STARTUP_BUDGET_MS', 1500))
+# 첫 사용 시점까지 import를 미뤄야 하는 모듈
+LAZY_MODULES = ['pandas', 'numpy', 'telegram']
+TOP_N = 15
+
+
+def measure():
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    # 스케줄러는 띄우지 않고 import 비용만 측정합니다.
+    env['WERKZEUG_RUN_MAIN'] = 'true'
+    env.setdefault('DATABASE_URL', 'sqlite://')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=backend_dir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace('import time:', '|', 1).split('|'))
+        timings[name.strip()] = (int(self_us), int(cumulative_us), len(name) - len(name.lstrip()))
+    return timings
+
+
+def main():
+    timings = measure()
+    total_ms = timings['app'][1] / 1000
+    imported = set(timings)
+
+    print(f"import app: {total_ms:.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    print(f"Top {TOP_N} top-level imports by cumulative time:")
+    top_level = [(name, cumulative) for name, (_, cumulative, depth) in timings.items() if '.' not in name]
+    for name, cumulative in sorted(top_level, key=lambda item: item[1], reverse=True)[:TOP_N]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in imported]
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > STARTUP_BUDGET_MS:
+        print(f"FAIL: startup took {total_ms:.1f} ms, over the {STARTUP_BUDGET_MS} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
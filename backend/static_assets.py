@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+
+from flask import Response, send_from_directory
+
+try:
+    import brotli  # 선택 의존성 (없으면 gzip 변형만 만듭니다)
+except ImportError:
+    brotli = None
+
+# Vite가 assets/ 폴더에 내보내는 지문(8자 base64url 해시)이 붙은 파일: assets/index-DiwrgTda.css 등.
+# public/ 에서 그대로 복사된 파일(apple-touch-icon-180x180.png 등)은 이름이 바뀌지 않으므로 제외됩니다.
+ASSETS_DIR = 'assets/'
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8}\.\w+$')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml',
+                      'application/xml', 'application/manifest+json')
+# 이보다 작은 파일은 압축해도 이득이 거의 없습니다.
+MIN_COMPRESS_BYTES = 1024
+# 이보다 큰 파일은 메모리에 올리지 않고 디스크에서 보냅니다.
+MAX_INMEMORY_BYTES = int(os.environ.get('STATIC_MAX_INMEMORY_BYTES', 4 * 1024 * 1024))
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+class Asset:
+    """manifest 항목 하나. variants는 {'identity'|'gzip'|'br': bytes} (큰 파일은 비어 있음)."""
+
+    def __init__(self, path, mimetype, etag, hashed, variants):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+        self.hashed = hashed
+        self.variants = variants
+
+    @property
+    def cache_control(self):
+        return IMMUTABLE_CACHE if self.hashed else REVALIDATE_CACHE
+
+
+def is_fingerprinted(rel_path):
+    """내용이 바뀌면 이름도 바뀌는(immutable 캐시해도 되는) 빌드 산출물인지."""
+    return rel_path.startswith(ASSETS_DIR) and bool(HASHED_NAME.search(rel_path))
+
+
+def _compressible(mimetype):
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _load_asset(root, rel_path):
+    full_path = os.path.join(root, rel_path)
+    mimetype = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+    hashed = is_fingerprinted(rel_path)
+    if os.path.getsize(full_path) > MAX_INMEMORY_BYTES:
+        stat = os.stat(full_path)
+        return Asset(rel_path, mimetype, f"{stat.st_mtime_ns:x}-{stat.st_size:x}", hashed, {})
+
+    with open(full_path, 'rb') as f:
+        data = f.read()
+    variants = {'identity': data}
+    if _compressible(mimetype) and len(data) >= MIN_COMPRESS_BYTES:
+        # 빌드 도구가 만들어 둔 .gz/.br이 있으면 그대로 쓰고, 없으면 여기서 최대 압축률로 만듭니다.
+        for encoding, suffix, compress in (('gzip', '.gz', lambda d: gzip.compress(d, 9, mtime=0)),
+                                           ('br', '.br', brotli.compress if brotli else None)):
+            if os.path.exists(full_path + suffix):
+                with open(full_path + suffix, 'rb') as f:
+                    variants[encoding] = f.read()
+            elif compress is not None:
+                compressed = compress(data)
+                if len(compressed) < len(data):
+                    variants[encoding] = compressed
+    return Asset(rel_path, mimetype, hashlib.sha1(data).hexdigest()[:20], hashed, variants)
+
+
+class StaticManifest:
+    """
+    frontend/dist를 시작 시 한 번 읽어 둔 인메모리 목록.
+    요청마다 파일 시스템을 확인하지 않고, 미리 압축한 gzip/br 본문을 Accept-Encoding에 맞춰 보냅니다.
+    지문이 붙은 파일은 1년 immutable 캐시, 그 외(index.html 등)는 ETag로 재검증합니다.
+    프론트엔드를 다시 빌드했다면 reload()를 호출하거나 서버를 재시작해야 합니다.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+
+    def reload(self):
+        assets = {}
+        if os.path.isdir(self.root):
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                # .vite/manifest.json 같은 빌드 메타데이터는 서비스하지 않습니다.
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                for filename in filenames:
+                    if filename.endswith(('.gz', '.br')):
+                        continue
+                    rel_path = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, '/')
+                    try:
+                        assets[rel_path] = _load_asset(self.root, rel_path)
+                    except OSError as e:
+                        logging.error(f"Failed to index static asset {rel_path}: {e}")
+        else:
+            logging.warning(f"Static folder {self.root} does not exist; run the frontend build.")
+        self.assets = assets
+        total = sum(len(v) for asset in assets.values() for v in asset.variants.values())
+        logging.info(f"Indexed {len(assets)} static assets ({total} bytes in memory).")
+        return self
+
+    def lookup(self, path):
+        """경로에 해당하는 Asset. 없는 경로는 SPA 라우팅을 위해 index.html로 대체합니다."""
+        return self.assets.get(path) or self.assets.get('index.html')
+
+    def response(self, path, request):
+        asset = self.lookup(path)
+        if asset is None:
+            return Response('Frontend build not found.', status=404, mimetype='text/plain')
+
+        if not asset.variants:
+            response = send_from_directory(self.root, asset.path, conditional=True, etag=asset.etag, max_age=None)
+        else:
+            encoding = 'identity'
+            for candidate in ('br', 'gzip'):
+                if candidate in asset.variants and request.accept_encodings[candidate]:
+                    encoding = candidate
+                    break
+            response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+            if len(asset.variants) > 1:
+                response.headers['Vary'] = 'Accept-Encoding'
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+            # 압축 변형마다 본문이 다르므로 ETag도 구분합니다.
+            response.set_etag(asset.etag if encoding == 'identity' else f"{asset.etag}-{encoding}")
+            response.make_conditional(request)
+        response.headers['Cache-Control'] = asset.cache_control
+        return response
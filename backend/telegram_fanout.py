@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from telegram.error import BadRequest, Forbidden, RetryAfter, TimedOut, NetworkError
+
+import metrics
+
+# 텔레그램 봇 발송 한도: 전체 초당 약 30건, 같은 채팅에는 초당 1건
+GLOBAL_RATE = 25
+PER_CHAT_RATE = 1
+# 전역 버킷의 최대 버스트. 첫 1초에도 버스트 + 초당 한도가 텔레그램 한도(약 30건)를 넘지 않도록 작게 둡니다.
+GLOBAL_BURST = 5
+
+
+class TokenBucket:
+    """asyncio용 토큰 버킷. rate는 초당 토큰 수, capacity는 최대 버스트 크기입니다."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds):
+        """retry_after 응답을 받으면 해당 시간 동안 토큰 발급을 멈춥니다."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+class FanoutStats:
+    def __init__(self):
+        self.queued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def as_dict(self):
+        elapsed = self.elapsed
+        return {
+            'queued': self.queued,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'elapsed_sec': round(elapsed, 3),
+            'per_sec': round(self.sent / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+def _observe(started, outcome):
+    metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream='telegram', outcome=outcome)
+    if outcome != 'ok':
+        metrics.UPSTREAM_ERRORS.inc(upstream='telegram', kind=outcome)
+
+
+class TelegramFanout:
+    """
+    전역/채팅별 토큰 버킷으로 발송 속도를 제한하면서 여러 메시지를 동시에 보냅니다.
+    RetryAfter를 받으면 지정된 시간만큼 전체 발송을 멈춘 뒤 재시도합니다.
+    """
+
+    def __init__(self, bot, concurrency=20, global_rate=GLOBAL_RATE, per_chat_rate=PER_CHAT_RATE, max_retries=3,
+                 global_burst=GLOBAL_BURST):
+        self.bot = bot
+        self.max_retries = max_retries
+        self.per_chat_rate = per_chat_rate
+        self.stats = FanoutStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._global = TokenBucket(global_rate, capacity=min(global_burst, global_rate))
+        self._chats = {}
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.per_chat_rate, capacity=1)
+        return bucket
+
+    async def _attempt(self, chat_id, text):
+        """한 번 발송을 시도하고 'sent', 'retry'(바로 재시도), 'backoff'(잠시 후 재시도), 'failed' 중 하나를 반환합니다."""
+        await self._global.acquire()
+        started = time.perf_counter()
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text)
+            _observe(started, 'ok')
+            return 'sent'
+        except RetryAfter as e:
+            _observe(started, 'retry_after')
+            delay = e.retry_after
+            if isinstance(delay, timedelta):
+                delay = delay.total_seconds()
+            logging.warning(f"Telegram flood limit hit, pausing for {delay}s.")
+            self._global.pause(delay)
+            return 'retry'
+        except (BadRequest, Forbidden) as e:
+            # 잘못된 chat_id, 봇 차단 등은 재시도해도 같은 결과이므로 바로 실패 처리합니다.
+            # (BadRequest는 NetworkError의 하위 클래스라 아래 절보다 먼저 잡아야 합니다.)
+            _observe(started, 'rejected')
+            logging.error(f"Telegram rejected message to chat {chat_id}: {e}")
+            return 'failed'
+        except (TimedOut, NetworkError) as e:
+            _observe(started, 'timeout' if isinstance(e, TimedOut) else 'network')
+            logging.warning(f"Transient error sending to chat {chat_id}: {e}")
+            return 'backoff'
+        except Exception as e:
+            _observe(started, 'error')
+            logging.error(f"FAILED to send message to chat {chat_id}: {e}")
+            return 'failed'
+
+    async def _send_one(self, chat_id, text):
+        for attempt in range(self.max_retries + 1):
+            # 채팅별 토큰은 동시 발송 슬롯 밖에서 기다립니다. 한 채팅에 메시지가 몰려도
+            # 그 대기 때문에 슬롯이 채워져 다른 사용자의 발송이 막히지 않습니다.
+            await self._chat_bucket(chat_id).acquire()
+            async with self._semaphore:
+                outcome = await self._attempt(chat_id, text)
+            if outcome == 'sent':
+                self.stats.sent += 1
+                metrics.TELEGRAM_MESSAGES.inc(outcome='sent')
+                return True
+            if outcome == 'failed':
+                break
+            if attempt < self.max_retries:
+                self.stats.retried += 1
+                metrics.TELEGRAM_MESSAGES.inc(outcome='retried')
+                if outcome == 'backoff':
+                    # 일시적 오류 백오프도 슬롯을 잡지 않은 채로 기다립니다.
+                    await asyncio.sleep(min(2 ** attempt, 30))
+        self.stats.failed += 1
+        metrics.TELEGRAM_MESSAGES.inc(outcome='failed')
+        return False
+
+    async def send(self, messages):
+        """
+        messages: (chat_id, text, payload) 튜플 목록.
+        발송에 성공한 메시지의 payload 목록을 반환합니다.
+        """
+        self.stats.queued += len(messages)
+        results = await asyncio.gather(*(self._send_one(chat_id, text) for chat_id, text, _ in messages))
+        return [payload for (_, _, payload), ok in zip(messages, results) if ok]
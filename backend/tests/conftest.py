@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 테스트는 backend/ 모듈을 최상위 모듈로 import 합니다 (app.py와 같은 방식).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
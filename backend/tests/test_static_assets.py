@@ -0,0 +1,41 @@
+import pytest
+
+import static_assets
+from static_assets import StaticManifest, is_fingerprinted
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('assets/index-DiwrgTda.css', True),  # 숫자가 없는 Vite 해시
+    ('assets/index-4f8a1c2d.js', True),
+    ('assets/vendor-a_B-c9Xy.js', True),
+    ('apple-touch-icon-180x180.png', False),  # public/ 에서 복사된 파일
+    ('index.html', False),
+    ('assets/logo.svg', False),
+    ('favicon-DiwrgTda.ico', False),  # assets/ 밖
+])
+def test_is_fingerprinted(path, expected):
+    assert is_fingerprinted(path) is expected
+
+
+def _write(root, rel_path, data):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_manifest_cache_policy_and_variants(tmp_path):
+    _write(tmp_path, 'index.html', b'<html>' + b' ' * 2048 + b'</html>')
+    _write(tmp_path, 'assets/index-DiwrgTda.css', b'body{color:red}' * 200)
+    _write(tmp_path, 'apple-touch-icon-180x180.png', b'\x89PNG' + b'\x00' * 10)
+    _write(tmp_path, '.vite/manifest.json', b'{}')
+
+    manifest = StaticManifest(str(tmp_path)).reload()
+
+    assert set(manifest.assets) == {'index.html', 'assets/index-DiwrgTda.css', 'apple-touch-icon-180x180.png'}
+    css = manifest.assets['assets/index-DiwrgTda.css']
+    assert css.cache_control == static_assets.IMMUTABLE_CACHE
+    assert 'gzip' in css.variants
+    assert manifest.assets['apple-touch-icon-180x180.png'].cache_control == static_assets.REVALIDATE_CACHE
+    assert manifest.assets['index.html'].cache_control == static_assets.REVALIDATE_CACHE
+    # SPA 라우트는 index.html로 대체됩니다.
+    assert manifest.lookup('calendar').path == 'index.html'
@@ -7,8 +7,15 @@ const CalendarScreen = () => {
 
   useEffect(() => {
     const fetchEvents = async () => {
+      // 현재 보고 있는 달과 접수 기간이 겹치는 일정만 요청합니다.
+      const pad = (n) => String(n).padStart(2, '0');
+      const year = currentDate.getFullYear();
+      const month = currentDate.getMonth() + 1;
+      const lastDay = new Date(year, month, 0).getDate();
+      const start = `${year}-${pad(month)}-01`;
+      const end = `${year}-${pad(month)}-${pad(lastDay)}`;
       try {
-        const response = await fetch('/api/calendar_events');
+        const response = await fetch(`/api/calendar_events?start=${start}&end=${end}`);
         const data = await response.json();
         setEvents(data);
       } catch (error) {
@@ -16,7 +23,7 @@ const CalendarScreen = () => {
       }
     };
     fetchEvents();
-  }, []);
+  }, [currentDate]);
 
   const startOfMonth = new Date(currentDate.getFullYear(), currentDate.getMonth(), 1);
   const endOfMonth = new Date(currentDate.getFullYear(), currentDate.getMonth() + 1, 0);
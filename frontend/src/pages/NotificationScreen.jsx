@@ -5,26 +5,45 @@ const NotificationScreen = () => {
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // 서버는 최신순으로 한 페이지씩 보내고, 다음 페이지 커서를 X-Next-Cursor 헤더로 알려줍니다.
+  const fetchPage = async (cursor) => {
+    const url = cursor ? `/api/notifications?cursor=${encodeURIComponent(cursor)}` : '/api/notifications';
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error('알림을 불러오는데 실패했습니다.');
+    }
+    const data = await response.json();
+    setNextCursor(response.headers.get('X-Next-Cursor'));
+    return data;
+  };
 
   useEffect(() => {
     const fetchNotifications = async () => {
       try {
         setLoading(true);
-        const response = await fetch('/api/notifications');
-        if (response.ok) {
-          const data = await response.json();
-          setNotifications(data);
-        } else {
-          setError('알림을 불러오는데 실패했습니다.');
-        }
+        setNotifications(await fetchPage(null));
       } catch (err) {
-        setError('서버와 통신 중 오류가 발생했습니다.');
+        setError(err.message || '서버와 통신 중 오류가 발생했습니다.');
       }
       setLoading(false);
     };
     fetchNotifications();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await fetchPage(nextCursor);
+      setNotifications(prev => [...prev, ...data]);
+    } catch (err) {
+      setError(err.message || '서버와 통신 중 오류가 발생했습니다.');
+    }
+    setLoadingMore(false);
+  };
+
   const formatTimeAgo = (dateString) => {
     const date = new Date(dateString);
     const now = new Date();
@@ -80,6 +99,15 @@ const NotificationScreen = () => {
           ))}
         </ul>
       )}
+      {nextCursor && (
+        <button
+          onClick={loadMore}
+          disabled={loadingMore}
+          className="w-full py-2 text-sm text-blue-500 bg-white border rounded-lg hover:bg-gray-50 disabled:text-gray-400"
+        >
+          {loadingMore ? '불러오는 중...' : '이전 알림 더 보기'}
+        </button>
+      )}
     </div>
   );
 };